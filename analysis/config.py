@@ -2,12 +2,23 @@
 Analysis Configuration
 논문 게재용 Consensus Layer 분석 설정
 """
+import functools
 import os
 from typing import Dict, List
 
-# API 설정
-OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY')
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+from dotenv import load_dotenv
+
+# API 키 - import 시점이 아닌 첫 사용 시점에 1회 해석 (dotenv 로드 순서와 무관)
+@functools.cache
+def get_openrouter_key():
+    load_dotenv(os.path.join(os.path.dirname(__file__), '..', 'backend', '.env'))
+    return os.getenv('OPENROUTER_API_KEY')
+
+
+@functools.cache
+def get_openai_key():
+    load_dotenv(os.path.join(os.path.dirname(__file__), '..', 'backend', '.env'))
+    return os.getenv('OPENAI_API_KEY')
 
 # LLM 모델 설정
 FREE_MODELS = {
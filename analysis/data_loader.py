@@ -2,32 +2,71 @@
 Dataset Loader for WildJailbreak
 allenai/wildjailbreak 데이터셋 로드 및 샘플링
 """
+import hashlib
+import json
+import math
+import os
 import random
 from typing import Dict, List, Tuple
 from datasets import load_dataset
+import numpy as np
 import pandas as pd
-from config import DATASET_NAME, SAMPLE_RATIO, TOTAL_SAMPLES
+import pyarrow as pa
+import pyarrow.compute as pc
+from config import DATASET_NAME, SAMPLE_RATIO, TOTAL_SAMPLES, RESULTS_DIR
 
 
 class WildJailbreakLoader:
     """WildJailbreak 데이터셋 로더"""
-    
-    def __init__(self):
-        """데이터셋 초기화"""
+
+    def __init__(self, streaming: bool = False):
+        """
+        데이터셋 초기화 (실제 로드는 첫 접근 시점까지 지연됨)
+
+        Args:
+            streaming: True면 전체 다운로드 없이 스트리밍으로 순회 (reservoir 샘플링 사용)
+        """
+        self.streaming = streaming
+        self._train_data = None
+
+    @property
+    def train_data(self):
+        """데이터셋 lazy 로드 - 샘플 캐시가 히트하면 아예 로드되지 않음"""
+        if self._train_data is None:
+            self._train_data = self._load_dataset()
+        return self._train_data
+
+    def _load_dataset(self):
+        """데이터셋 로드"""
         print(f"Loading dataset: {DATASET_NAME}...")
         # Training set 로드 (모든 4개 카테고리 포함: 261K samples)
-        dataset = load_dataset(DATASET_NAME, 'train', delimiter="\t", keep_default_na=False)
-        self.train_data = dataset['train']
-        print(f"Dataset loaded successfully")
-        print(f"  - Total samples: {len(self.train_data):,}")
-        
-        # data_type 분포 확인
-        from collections import Counter
-        data_types = Counter(self.train_data['data_type'])
-        print(f"  - Category distribution:")
-        for dtype, count in sorted(data_types.items()):
-            print(f"    {dtype}: {count:,}")
-        
+        dataset = load_dataset(DATASET_NAME, 'train', delimiter="\t", keep_default_na=False,
+                               streaming=self.streaming)
+        train_data = dataset['train']
+
+        if self.streaming:
+            # 멀티 워커 환경이면 스트림을 워커별로 분할
+            world_size = int(os.environ.get('WORLD_SIZE', '1'))
+            if world_size > 1:
+                from datasets.distributed import split_dataset_by_node
+                rank = int(os.environ.get('RANK', '0'))
+                train_data = split_dataset_by_node(train_data, rank=rank, world_size=world_size)
+                print(f"Dataset opened in streaming mode (worker {rank}/{world_size})")
+            else:
+                print(f"Dataset opened in streaming mode")
+        else:
+            print(f"Dataset loaded successfully")
+            print(f"  - Total samples: {len(train_data):,}")
+
+            # data_type 분포 확인
+            from collections import Counter
+            data_types = Counter(train_data['data_type'])
+            print(f"  - Category distribution:")
+            for dtype, count in sorted(data_types.items()):
+                print(f"    {dtype}: {count:,}")
+
+        return train_data
+
     def load_and_sample(self, total_samples: int = TOTAL_SAMPLES, 
                        ratio: Dict[str, int] = SAMPLE_RATIO,
                        random_seed: int = 42) -> pd.DataFrame:
@@ -42,11 +81,21 @@ class WildJailbreakLoader:
         Returns:
             pd.DataFrame: 샘플링된 데이터
         """
-        random.seed(random_seed)
-        
+        # 샘플링 파라미터로 캐시 키 계산 - 동일 파라미터 재실행은 Parquet 한 번 읽기로 끝남
+        cache_key = hashlib.sha1(json.dumps(
+            {'t': total_samples, 'r': ratio, 's': random_seed}, sort_keys=True
+        ).encode()).hexdigest()[:16]
+        cache_path = os.path.join(RESULTS_DIR, 'cache', f'sample_{cache_key}.parquet')
+
+        if os.path.exists(cache_path):
+            # Arrow 기반 dtype으로 로드 - 신규 샘플링 경로와 동일한 메모리 레이아웃
+            df = pd.read_parquet(cache_path, dtype_backend='pyarrow')
+            print(f"Loaded cached sample: {cache_path} ({len(df)} rows)")
+            return df
+
         # 비율 합계 계산
         total_ratio = sum(ratio.values())
-        
+
         # 각 카테고리별 샘플 수 계산
         samples_per_category = {
             category: int((count / total_ratio) * total_samples)
@@ -57,72 +106,131 @@ class WildJailbreakLoader:
         for category, count in samples_per_category.items():
             print(f"  {category}: {count} samples")
         
-        # 데이터 분류 및 수집
-        vanilla_harmful = []
-        vanilla_benign = []
-        adversarial_harmful = []
-        adversarial_benign = []
-        
         print(f"\nProcessing training data...")
+
+        if self.streaming:
+            sampled_chunks = self._sample_streaming(samples_per_category, random_seed)
+        else:
+            sampled_chunks = self._sample_eager(samples_per_category, random_seed)
+
+        # 카테고리별 배열을 바로 Arrow 테이블로 조립 (행 단위 dict 생성 없음)
+        category_names = [category for category, _ in sampled_chunks]
+        sizes = [len(prompts) for _, prompts in sampled_chunks]
+        prompts = np.concatenate([prompts for _, prompts in sampled_chunks])
+        labels = np.repeat([category.endswith('_harmful') for category in category_names], sizes)
+        codes = np.repeat(np.arange(len(category_names), dtype=np.int8), sizes)
+
+        table = pa.table({
+            'prompt': pa.array(prompts, type=pa.string()),
+            'is_harmful': pa.array(labels),
+            'category': pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int8()),
+                                                       pa.array(category_names))
+        })
+
+        # 섞기 - 인덱스 permutation 한 번으로 처리
+        rng = np.random.default_rng(random_seed)
+        table = table.take(rng.permutation(len(table)))
+
+        # Arrow 기반 DataFrame으로 변환 (zero-copy)
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
         
-        # Training set에서 모든 카테고리 분류
+        print(f"\nFinal dataset: {len(df)} samples")
+        print(df['category'].value_counts())
+
+        # 캐시 저장 - 다음 실행은 데이터셋 로드/샘플링 전체를 건너뜀
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        df.to_parquet(cache_path, compression='zstd')
+        print(f"Sample cached to: {cache_path}")
+
+        return df
+
+    def _sample_eager(self, samples_per_category: Dict[str, int],
+                      random_seed: int) -> List[Tuple[str, np.ndarray]]:
+        """Arrow 테이블에서 카테고리별 필터링 + 샘플링 (eager 모드)"""
+        # 필요한 컬럼만 선택 (column projection) - 나머지 컬럼은 역직렬화하지 않음
+        table = self.train_data.data.table.select(['data_type', 'vanilla', 'adversarial'])
+
+        rng = np.random.default_rng(random_seed)
+
+        # 카테고리별로 Arrow 필터를 내려서 (predicate pushdown) 해당 행만 NumPy 배열로 추출
+        sampled_chunks = []
+        print(f"\nAvailable samples by category:")
+        for category, count in samples_per_category.items():
+            prompt_column = 'vanilla' if category.startswith('vanilla') else 'adversarial'
+            pool = (
+                table
+                .filter(pc.equal(table['data_type'], category))
+                .column(prompt_column)
+                .to_pandas()
+                .to_numpy()
+            )
+            print(f"  {category}: {len(pool):,}")
+
+            if len(pool) < count:
+                print(f"  Warning: {category} has only {len(pool)} samples, requested {count}")
+                sampled = pool
+            else:
+                sampled = rng.choice(pool, size=count, replace=False)
+
+            sampled_chunks.append((category, sampled))
+
+        return sampled_chunks
+
+    def _sample_streaming(self, samples_per_category: Dict[str, int],
+                          random_seed: int) -> List[Tuple[str, np.ndarray]]:
+        """
+        스트리밍 이터레이터에 대한 reservoir 샘플링 (Algorithm L)
+
+        카테고리당 count개만 메모리에 유지하면서 스트림을 한 번만 통과한다.
+        앞부분 N개만 읽고 자르는 방식과 달리 전체 스트림에서 균등하게 샘플링됨.
+        """
+        rng = random.Random(random_seed)
+
+        reservoirs = {category: [] for category in samples_per_category}
+        # Algorithm L 상태: 지금까지 본 수, 다음 교체 시점(1-based 위치), 가중치 w
+        state = {}
+        for category, count in samples_per_category.items():
+            if count <= 0:
+                continue
+            w = math.exp(math.log(rng.random()) / count)
+            state[category] = {
+                'seen': 0,
+                'w': w,
+                'next': count + int(math.log(rng.random()) / math.log(1.0 - w)) + 1
+            }
+
         for example in self.train_data:
             data_type = example.get('data_type', '')
-            
-            if data_type == 'vanilla_harmful':
-                prompt = example.get('vanilla', '')
-                vanilla_harmful.append({'prompt': prompt, 'is_harmful': True, 'data_type': data_type})
-            elif data_type == 'vanilla_benign':
-                prompt = example.get('vanilla', '')
-                vanilla_benign.append({'prompt': prompt, 'is_harmful': False, 'data_type': data_type})
-            elif data_type == 'adversarial_harmful':
-                prompt = example.get('adversarial', '')
-                adversarial_harmful.append({'prompt': prompt, 'is_harmful': True, 'data_type': data_type})
-            elif data_type == 'adversarial_benign':
-                prompt = example.get('adversarial', '')
-                adversarial_benign.append({'prompt': prompt, 'is_harmful': False, 'data_type': data_type})
-        
+            st = state.get(data_type)
+            if st is None:
+                continue
+
+            count = samples_per_category[data_type]
+            reservoir = reservoirs[data_type]
+            prompt_column = 'vanilla' if data_type.startswith('vanilla') else 'adversarial'
+
+            if len(reservoir) < count:
+                reservoir.append(example.get(prompt_column, ''))
+            elif st['seen'] + 1 == st['next']:
+                # next는 1-based 위치, seen은 현재 항목의 0-based 인덱스
+                # 교체 시점 도달: 랜덤 슬롯 교체 후 다음 건너뛸 구간 계산
+                reservoir[rng.randrange(count)] = example.get(prompt_column, '')
+                st['w'] *= math.exp(math.log(rng.random()) / count)
+                st['next'] += int(math.log(rng.random()) / math.log(1.0 - st['w'])) + 1
+            st['seen'] += 1
+
+        sampled_chunks = []
         print(f"\nAvailable samples by category:")
-        print(f"  vanilla_harmful: {len(vanilla_harmful):,}")
-        print(f"  vanilla_benign: {len(vanilla_benign):,}")
-        print(f"  adversarial_harmful: {len(adversarial_harmful):,}")
-        print(f"  adversarial_benign: {len(adversarial_benign):,}")
-        
-        # 각 카테고리에서 샘플링
-        categories = {
-            'vanilla_harmful': vanilla_harmful,
-            'vanilla_benign': vanilla_benign,
-            'adversarial_harmful': adversarial_harmful,
-            'adversarial_benign': adversarial_benign
-        }
-        
-        sampled_data = []
         for category, count in samples_per_category.items():
-            available = categories[category]
-            if len(available) < count:
-                print(f"  Warning: {category} has only {len(available)} samples, requested {count}")
-                sampled = available
-            else:
-                sampled = random.sample(available, count)
-            
-            for example in sampled:
-                sampled_data.append({
-                    'prompt': example['prompt'],
-                    'is_harmful': example['is_harmful'],
-                    'category': category
-                })
-        
-        # DataFrame으로 변환
-        df = pd.DataFrame(sampled_data)
-        
-        # 섞기
-        df = df.sample(frac=1, random_state=random_seed).reset_index(drop=True)
-        
-        print(f"\nFinal dataset: {len(df)} samples")
-        print(df['category'].value_counts())
-        
-        return df
-    
+            reservoir = reservoirs[category]
+            print(f"  {category}: {state.get(category, {}).get('seen', 0):,} seen, {len(reservoir)} sampled")
+            if len(reservoir) < count:
+                print(f"  Warning: {category} has only {len(reservoir)} samples, requested {count}")
+
+            sampled_chunks.append((category, np.asarray(reservoir, dtype=object)))
+
+        return sampled_chunks
+
     def explore_dataset(self, num_examples: int = 5):
         """
         데이터셋 구조 탐색 (디버깅용)
@@ -135,18 +243,37 @@ class WildJailbreakLoader:
         print(f"{'='*80}")
         
         print(f"\nTraining Dataset")
-        print(f"  Size: {len(self.train_data):,}")
-        print(f"  Features: {self.train_data.features}")
-        
-        # 각 data_type별로 예시 출력
-        from collections import defaultdict
-        examples_by_type = defaultdict(list)
-        
-        for example in self.train_data:
-            data_type = example.get('data_type', '')
-            if len(examples_by_type[data_type]) < 2:  # 각 타입별 2개씩
-                examples_by_type[data_type].append(example)
-        
+        if self.streaming:
+            print(f"  (streaming mode - size unknown)")
+        else:
+            print(f"  Size: {len(self.train_data):,}")
+            print(f"  Features: {self.train_data.features}")
+
+        categories = ['vanilla_harmful', 'vanilla_benign', 'adversarial_harmful', 'adversarial_benign']
+        examples_by_type = {}
+
+        if self.streaming:
+            # 스트리밍: 모든 카테고리가 2개씩 모이는 즉시 순회 중단 (전체 스캔 없음)
+            examples_by_type = {category: [] for category in categories}
+            remaining = len(categories) * 2
+            for example in self.train_data:
+                bucket = examples_by_type.get(example.get('data_type', ''))
+                if bucket is not None and len(bucket) < 2:
+                    bucket.append(example)
+                    remaining -= 1
+                    if remaining == 0:
+                        break
+        else:
+            # eager: 카테고리별 Arrow 필터로 앞 2개 행만 추출 (전체 스캔 없음)
+            table = self.train_data.data.table
+            for category in categories:
+                examples_by_type[category] = (
+                    table
+                    .filter(pc.equal(table['data_type'], category))
+                    .slice(0, 2)
+                    .to_pylist()
+                )
+
         print(f"\n  Examples by data_type:")
         for data_type in sorted(examples_by_type.keys()):
             print(f"\n  [{data_type}]")
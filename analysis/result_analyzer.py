@@ -2,23 +2,184 @@
 Result Analyzer and Visualizer
 실험 결과 분석 및 시각화 (논문 게재용)
 """
+import functools
 import os
-import json
+import orjson
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score, f1_score,
-    confusion_matrix, classification_report
-)
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Any
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 
 from config import RAW_DATA_DIR, VISUALIZATIONS_DIR, REPORTS_DIR
 
 
+# 플롯 렌더러들은 ProcessPoolExecutor로 넘겨야 하므로 모듈 레벨 함수로 둔다
+# (picklable 인자만 받음 - DataFrame/self는 워커로 복사하지 않음)
+
+# 저장 옵션: bbox_inches='tight'는 전체 레이아웃 재계산을 한 번 더 돌리므로
+# tight_layout을 이미 호출하는 그림에서는 생략. 150dpi면 논문 삽입에 충분.
+_SAVEFIG = {'dpi': 150}
+
+
+def _pyplot():
+    """렌더링 시점에만 matplotlib 로드 - 지표 계산만 하는 경우 import 비용이 0"""
+    import matplotlib
+    matplotlib.use('Agg')  # 워커 프로세스에서도 headless 렌더링 보장
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _render_accuracy_comparison(metrics: Dict[str, Dict[str, float]],
+                                models: List[str], experiment_name: str):
+    """정확도 비교 막대 그래프"""
+    plt = _pyplot()
+    models_list = ['consensus'] + models
+    accuracies = [metrics[model]['accuracy'] for model in models_list]
+
+    # 모델 이름 포맷팅
+    model_labels = ['Consensus\n(5 models)'] + [m.upper() for m in models]
+
+    plt.figure(figsize=(12, 6))
+    colors = ['#2ecc71' if model == 'consensus' else '#3498db' for model in models_list]
+    bars = plt.bar(model_labels, accuracies, color=colors, alpha=0.8, edgecolor='black')
+
+    # 값 표시
+    for bar, acc in zip(bars, accuracies):
+        height = bar.get_height()
+        plt.text(bar.get_x() + bar.get_width()/2., height,
+                f'{acc:.4f}',
+                ha='center', va='bottom', fontsize=10, fontweight='bold')
+
+    plt.xlabel('Model', fontsize=12, fontweight='bold')
+    plt.ylabel('Accuracy', fontsize=12, fontweight='bold')
+    plt.title('Model Accuracy Comparison: Consensus vs Individual Models',
+             fontsize=14, fontweight='bold', pad=20)
+    plt.ylim(0, 1.1)
+    plt.grid(axis='y', alpha=0.3, linestyle='--')
+    plt.tight_layout()
+
+    output_path = os.path.join(VISUALIZATIONS_DIR, f"{experiment_name}_accuracy_comparison.png")
+    plt.savefig(output_path, **_SAVEFIG)
+    print(f"Accuracy comparison plot saved to: {output_path}")
+    plt.close()
+
+
+def _render_metrics_radar(metrics: Dict[str, Dict[str, float]],
+                          models: List[str], experiment_name: str):
+    """레이더 차트로 여러 메트릭 비교"""
+    plt = _pyplot()
+    metric_names = ['Accuracy', 'Precision', 'Recall', 'F1 Score']
+
+    # 닫힌 다각형을 위해 첫 각도를 끝에 한 번 더 붙임
+    angles = np.linspace(0, 2 * np.pi, len(metric_names), endpoint=False)
+    angles = np.concatenate([angles, angles[:1]])
+
+    fig, ax = plt.subplots(figsize=(10, 10), subplot_kw={'projection': 'polar'})
+
+    for model_name in ['consensus'] + models:
+        model_metrics = metrics[model_name]
+        values = [
+            model_metrics['accuracy'],
+            model_metrics['precision'],
+            model_metrics['recall'],
+            model_metrics['f1_score']
+        ]
+        values = values + values[:1]
+
+        label = 'Consensus (5 models)' if model_name == 'consensus' else model_name.upper()
+        ax.plot(angles, values, linewidth=2, label=label)
+        ax.fill(angles, values, alpha=0.1)
+
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(metric_names, fontsize=14)
+    ax.set_ylim(0, 1)
+    ax.set_title('Model Performance Metrics Comparison',
+                 fontsize=16, fontweight='bold', pad=30)
+    # 범례를 figure 영역 안쪽에 둬서 bbox_inches='tight' 없이도 잘리지 않음
+    fig.legend(loc='lower right', fontsize=12)
+    plt.tight_layout()
+
+    output_path = os.path.join(VISUALIZATIONS_DIR, f"{experiment_name}_metrics_radar.png")
+    plt.savefig(output_path, **_SAVEFIG)
+    print(f"Radar chart saved to: {output_path}")
+    plt.close()
+
+
+def _render_confusion_matrices(metrics: Dict[str, Dict[str, float]],
+                               models: List[str], experiment_name: str):
+    """Confusion Matrix 시각화"""
+    plt = _pyplot()
+    n_models = len(models) + 1  # consensus 포함
+    n_cols = 3
+    n_rows = (n_models + n_cols - 1) // n_cols
+
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(15, 5 * n_rows))
+    axes = axes.flatten()
+
+    for idx, model_name in enumerate(['consensus'] + models):
+        cm = np.array(metrics[model_name]['confusion_matrix'])
+
+        # 2x2 행렬이라 seaborn heatmap 대신 imshow + 직접 주석이 훨씬 가벼움
+        im = axes[idx].imshow(cm, cmap='Blues')
+        fig.colorbar(im, ax=axes[idx])
+        threshold = cm.max() / 2
+        for (i, j), value in np.ndenumerate(cm):
+            axes[idx].text(j, i, f'{value:d}', ha='center', va='center',
+                           color='white' if value > threshold else 'black')
+        axes[idx].set_xticks([0, 1], labels=['Benign', 'Harmful'])
+        axes[idx].set_yticks([0, 1], labels=['Benign', 'Harmful'])
+
+        title = 'Consensus (5 models)' if model_name == 'consensus' else model_name.upper()
+        axes[idx].set_title(f'{title}\nAccuracy: {metrics[model_name]["accuracy"]:.4f}',
+                          fontweight='bold')
+        axes[idx].set_xlabel('Predicted')
+        axes[idx].set_ylabel('Actual')
+
+    # 빈 subplot 숨기기
+    for idx in range(n_models, len(axes)):
+        axes[idx].set_visible(False)
+
+    plt.suptitle('Confusion Matrices: Consensus vs Individual Models',
+                fontsize=16, fontweight='bold', y=1.00)
+    plt.tight_layout()
+
+    output_path = os.path.join(VISUALIZATIONS_DIR, f"{experiment_name}_confusion_matrices.png")
+    plt.savefig(output_path, **_SAVEFIG)
+    print(f"Confusion matrices saved to: {output_path}")
+    plt.close()
+
+
+def _render_category_performance(categories: np.ndarray, category_accuracy: np.ndarray,
+                                 models: List[str], experiment_name: str):
+    """카테고리별 성능 비교"""
+    plt = _pyplot()
+    x = np.arange(len(categories))
+    width = 0.15
+
+    fig, ax = plt.subplots(figsize=(14, 6))
+
+    for idx, model_name in enumerate(['consensus'] + models):
+        offset = width * (idx - len(models) / 2)
+        label = 'Consensus' if model_name == 'consensus' else model_name.upper()
+        ax.bar(x + offset, category_accuracy[idx], width, label=label, alpha=0.8)
+
+    ax.set_xlabel('Category', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Accuracy', fontsize=12, fontweight='bold')
+    ax.set_title('Accuracy by Prompt Category', fontsize=14, fontweight='bold')
+    ax.set_xticks(x)
+    ax.set_xticklabels([cat.replace('_', '\n') for cat in categories])
+    ax.legend(loc='upper right')
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+    ax.set_ylim(0, 1.1)
+
+    plt.tight_layout()
+
+    output_path = os.path.join(VISUALIZATIONS_DIR, f"{experiment_name}_category_performance.png")
+    plt.savefig(output_path, **_SAVEFIG)
+    print(f"Category performance plot saved to: {output_path}")
+    plt.close()
+
+
 class ResultAnalyzer:
     """실험 결과 분석 및 시각화"""
     
@@ -31,76 +192,148 @@ class ResultAnalyzer:
         os.makedirs(VISUALIZATIONS_DIR, exist_ok=True)
         os.makedirs(REPORTS_DIR, exist_ok=True)
         
-        # 실험 결과 로드
-        with open(experiment_file, 'r', encoding='utf-8') as f:
-            self.experiment_data = json.load(f)
-        
+        # 실험 결과 로드 - orjson이 stdlib json보다 큰 결과 파일 파싱이 훨씬 빠름
+        with open(experiment_file, 'rb') as f:
+            self.experiment_data = orjson.loads(f.read())
+
         self.experiment_name = self.experiment_data['experiment_name']
-        self.results = self.experiment_data['results']
         self.models = list(self.experiment_data['models'].keys())
-        
-        # 결과 DataFrame 생성
-        self.df = self._create_results_dataframe()
-        
+
+        # 결과 DataFrame 생성 (Parquet 사이드카가 있으면 그쪽에서 로드)
+        results_file = self.experiment_data.get('results_file')
+        if results_file:
+            parquet_path = os.path.join(os.path.dirname(experiment_file), results_file)
+            self.df = self._dataframe_from_parquet(parquet_path)
+        else:
+            # 구버전 실험 파일: results가 JSON 안에 인라인으로 저장됨
+            self.df = self._create_results_dataframe(self.experiment_data['results'])
+
+        self.n_samples = len(self.df)
+
+        # 자주 쓰는 컬럼을 NumPy 배열로 한 번만 추출 (structure-of-arrays)
+        # 이후 모든 지표/플롯 계산은 DataFrame 인덱싱 없이 이 배열들로 수행
+        self.y_true = self.df['ground_truth'].to_numpy(dtype=np.int8)
+        self.predictions = np.stack(
+            [self.df['consensus_prediction'].to_numpy(dtype=np.int8)]
+            + [self.df[f'{m}_prediction'].to_numpy(dtype=np.int8) for m in self.models]
+        )
+        # 응답시간은 보고용 평균에만 쓰여서 float32면 충분 (메모리 절반)
+        self.response_times = np.stack(
+            [self.df[f'{m}_response_time'].to_numpy(dtype=np.float32) for m in self.models]
+        )
+
         print(f"Loaded experiment: {self.experiment_name}")
-        print(f"Total samples: {len(self.results)}")
+        print(f"Total samples: {self.n_samples}")
         print(f"Models: {self.models}")
     
-    def _create_results_dataframe(self) -> pd.DataFrame:
-        """결과를 DataFrame으로 변환"""
-        data = []
-        
-        for result in self.results:
-            row = {
-                'prompt': result['prompt'],
-                'ground_truth': result['ground_truth'],
-                'category': result['category'],
-                'consensus_prediction': result['consensus_prediction'],
-                'consensus_correct': result['consensus_correct'],
-                'harmful_votes': result['harmful_votes'],
-                'safe_votes': result['safe_votes']
-            }
-            
-            # 개별 모델 결과 추가
-            for model in self.models:
-                model_result = result['model_results'][model]
-                row[f'{model}_prediction'] = model_result['is_harmful']
-                row[f'{model}_correct'] = result['individual_accuracy'][model]
-                row[f'{model}_response_time'] = model_result['response_time']
-            
-            data.append(row)
-        
-        return pd.DataFrame(data)
+    def _dataframe_from_parquet(self, parquet_path: str) -> pd.DataFrame:
+        """long-format Parquet 결과를 wide DataFrame으로 변환"""
+        # 분석에 쓰는 컬럼만 projection - model id/error 컬럼은 역직렬화하지 않음
+        long_df = pd.read_parquet(parquet_path, columns=[
+            'index', 'prompt', 'ground_truth', 'category',
+            'provider', 'is_harmful', 'response_time'
+        ])
+        threshold = self.experiment_data['consensus_threshold']
+
+        # 프롬프트 단위 컬럼 + 모델별 예측/응답시간 pivot
+        base = long_df.drop_duplicates('index').set_index('index')[['prompt', 'ground_truth', 'category']]
+        predictions = long_df.pivot(index='index', columns='provider', values='is_harmful')
+        response_times = long_df.pivot(index='index', columns='provider', values='response_time')
+
+        df = base.copy()
+        df['harmful_votes'] = predictions.sum(axis=1).astype(int)
+        df['safe_votes'] = predictions.shape[1] - df['harmful_votes']
+        df['consensus_prediction'] = df['harmful_votes'] >= threshold
+        df['consensus_correct'] = df['consensus_prediction'] == df['ground_truth']
+
+        for model in self.models:
+            df[f'{model}_prediction'] = predictions[model]
+            df[f'{model}_correct'] = predictions[model] == df['ground_truth']
+            df[f'{model}_response_time'] = response_times[model]
+
+        # 4개 값만 반복되는 컬럼이므로 categorical로 유지 (문자열 중복 제거)
+        df['category'] = df['category'].astype('category')
+
+        return df.sort_index().reset_index(drop=True)
+
+    def _create_results_dataframe(self, results: List[Dict[str, Any]]) -> pd.DataFrame:
+        """결과를 DataFrame으로 변환 (구버전 인라인 JSON 경로)"""
+        # 중첩 dict 평탄화를 행 단위 Python 루프 대신 json_normalize 한 번으로 처리
+        flat = pd.json_normalize(results)
+
+        df = flat[['prompt', 'ground_truth', 'category', 'consensus_prediction',
+                   'consensus_correct', 'harmful_votes', 'safe_votes']].copy()
+
+        # 개별 모델 결과: 평탄화된 컬럼을 이름만 바꿔서 그대로 가져옴
+        for model in self.models:
+            df[f'{model}_prediction'] = flat[f'model_results.{model}.is_harmful']
+            df[f'{model}_correct'] = flat[f'individual_accuracy.{model}']
+            df[f'{model}_response_time'] = flat[f'model_results.{model}.response_time']
+
+        # 4개 값만 반복되는 컬럼이므로 categorical로 유지 (문자열 중복 제거)
+        df['category'] = df['category'].astype('category')
+
+        return df
     
     def calculate_metrics(self) -> Dict[str, Dict[str, float]]:
-        """모든 모델 및 consensus에 대한 평가 지표 계산"""
+        """모든 모델 및 consensus에 대한 평가 지표 계산 (최초 1회만 계산됨)"""
+        return self.metrics
+
+    @functools.cached_property
+    def _joint_counts(self):
+        """(카테고리 배열, (모델 x 카테고리 x [TN,FP,FN,TP]) 카운트 테이블)
+
+        전체 confusion matrix(카테고리 합)와 카테고리별 정확도가 모두 이
+        테이블에서 유도되므로, 예측 행렬 전체를 도는 집계는 프로그램
+        전체에서 이 융합 패스 한 번만 일어난다.
+        """
+        # categorical 컬럼의 코드를 그대로 사용 - 문자열 비교/정렬 없음
+        category = self.df['category'].astype('category')
+        categories = category.cat.categories.to_numpy()
+        cat_codes = category.cat.codes.to_numpy()
+        n_categories = len(categories)
+        n_models = self.predictions.shape[0]
+
+        # 인코딩: (model_idx * n_categories + cat_code) * 4 + 2*y_true + y_pred
+        cell = 2 * self.y_true[None, :] + self.predictions
+        codes = (np.arange(n_models)[:, None] * n_categories + cat_codes[None, :]) * 4 + cell
+        counts = np.bincount(codes.ravel(), minlength=n_models * n_categories * 4)
+        return categories, counts.reshape(n_models, n_categories, 4)
+
+    @functools.cached_property
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """평가 지표 - 첫 접근 시 계산되고 인스턴스에 캐시됨"""
+        names = ['consensus'] + self.models
+
+        # 융합 카운트 테이블에서 카테고리 축을 합쳐 전체 confusion matrix 유도
+        _, joint = self._joint_counts
+        cms = joint.sum(axis=1).reshape(len(names), 2, 2)
+
+        # [TN, FP, FN, TP] 순서에서 전체 지표(config.METRICS 포함)를 벡터 연산으로 유도
+        tn, fp, fn, tp = cms[:, 0, 0], cms[:, 0, 1], cms[:, 1, 0], cms[:, 1, 1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            accuracy = np.nan_to_num((tp + tn) / cms.sum(axis=(1, 2)))
+            precision = np.nan_to_num(tp / (tp + fp))
+            recall = np.nan_to_num(tp / (tp + fn))
+            f1 = np.nan_to_num(2 * precision * recall / (precision + recall))
+            false_positive_rate = np.nan_to_num(fp / (fp + tn))
+            false_negative_rate = np.nan_to_num(fn / (fn + tp))
+
         metrics = {}
-        
-        # Consensus 메트릭
-        y_true = self.df['ground_truth'].astype(int)
-        y_pred = self.df['consensus_prediction'].astype(int)
-        
-        metrics['consensus'] = {
-            'accuracy': accuracy_score(y_true, y_pred),
-            'precision': precision_score(y_true, y_pred, zero_division=0),
-            'recall': recall_score(y_true, y_pred, zero_division=0),
-            'f1_score': f1_score(y_true, y_pred, zero_division=0),
-            'confusion_matrix': confusion_matrix(y_true, y_pred).tolist()
-        }
-        
-        # 개별 모델 메트릭
-        for model in self.models:
-            y_pred_model = self.df[f'{model}_prediction'].astype(int)
-            
-            metrics[model] = {
-                'accuracy': accuracy_score(y_true, y_pred_model),
-                'precision': precision_score(y_true, y_pred_model, zero_division=0),
-                'recall': recall_score(y_true, y_pred_model, zero_division=0),
-                'f1_score': f1_score(y_true, y_pred_model, zero_division=0),
-                'confusion_matrix': confusion_matrix(y_true, y_pred_model).tolist(),
-                'avg_response_time': self.df[f'{model}_response_time'].mean()
+        for idx, name in enumerate(names):
+            metrics[name] = {
+                'accuracy': float(accuracy[idx]),
+                'precision': float(precision[idx]),
+                'recall': float(recall[idx]),
+                'f1_score': float(f1[idx]),
+                'false_positive_rate': float(false_positive_rate[idx]),
+                'false_negative_rate': float(false_negative_rate[idx]),
+                'confusion_matrix': cms[idx].tolist()
             }
-        
+            if name != 'consensus':
+                metrics[name]['avg_response_time'] = float(
+                    self.response_times[idx - 1].mean(dtype=np.float64))
+
         return metrics
     
     def generate_comparison_table(self, metrics: Dict[str, Dict[str, float]]) -> pd.DataFrame:
@@ -126,206 +359,70 @@ class ResultAnalyzer:
         
         return df_comparison
     
+    def _category_accuracy(self):
+        """(카테고리 배열, (consensus+모델) x 카테고리 정확도 행렬) 계산"""
+        # 융합 카운트 테이블에서 유도: 정답 수 = TN + TP
+        categories, joint = self._joint_counts
+        hits = joint[:, :, 0] + joint[:, :, 3]
+        return categories, hits / joint.sum(axis=2)
+
     def plot_accuracy_comparison(self, metrics: Dict[str, Dict[str, float]]):
         """정확도 비교 막대 그래프"""
-        models_list = ['consensus'] + self.models
-        accuracies = [metrics[model]['accuracy'] for model in models_list]
-        
-        # 모델 이름 포맷팅
-        model_labels = ['Consensus\n(5 models)'] + [m.upper() for m in self.models]
-        
-        plt.figure(figsize=(12, 6))
-        colors = ['#2ecc71' if model == 'consensus' else '#3498db' for model in models_list]
-        bars = plt.bar(model_labels, accuracies, color=colors, alpha=0.8, edgecolor='black')
-        
-        # 값 표시
-        for bar, acc in zip(bars, accuracies):
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{acc:.4f}',
-                    ha='center', va='bottom', fontsize=10, fontweight='bold')
-        
-        plt.xlabel('Model', fontsize=12, fontweight='bold')
-        plt.ylabel('Accuracy', fontsize=12, fontweight='bold')
-        plt.title('Model Accuracy Comparison: Consensus vs Individual Models', 
-                 fontsize=14, fontweight='bold', pad=20)
-        plt.ylim(0, 1.1)
-        plt.grid(axis='y', alpha=0.3, linestyle='--')
-        plt.tight_layout()
-        
-        output_path = os.path.join(VISUALIZATIONS_DIR, f"{self.experiment_name}_accuracy_comparison.png")
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"Accuracy comparison plot saved to: {output_path}")
-        plt.close()
-    
+        _render_accuracy_comparison(metrics, self.models, self.experiment_name)
+
     def plot_metrics_radar(self, metrics: Dict[str, Dict[str, float]]):
         """레이더 차트로 여러 메트릭 비교"""
-        metric_names = ['Accuracy', 'Precision', 'Recall', 'F1 Score']
-        
-        fig = go.Figure()
-        
-        for model_name in ['consensus'] + self.models:
-            model_metrics = metrics[model_name]
-            values = [
-                model_metrics['accuracy'],
-                model_metrics['precision'],
-                model_metrics['recall'],
-                model_metrics['f1_score']
-            ]
-            
-            label = 'Consensus (5 models)' if model_name == 'consensus' else model_name.upper()
-            
-            fig.add_trace(go.Scatterpolar(
-                r=values,
-                theta=metric_names,
-                fill='toself',
-                name=label
-            ))
-        
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, 1],
-                    tickfont=dict(size=20)
-                ),
-                angularaxis=dict(
-                    tickfont=dict(size=24)
-                )
-            ),
-            showlegend=True,
-            title=dict(
-                text="Model Performance Metrics Comparison",
-                font=dict(size=20)
-            ),
-            legend=dict(
-                font=dict(size=22)
-            ),
-            font=dict(size=22)
-        )
-        
-        output_path = os.path.join(VISUALIZATIONS_DIR, f"{self.experiment_name}_metrics_radar.html")
-        fig.write_html(output_path)
-        print(f"Radar chart saved to: {output_path}")
-    
+        _render_metrics_radar(metrics, self.models, self.experiment_name)
+
     def plot_confusion_matrices(self, metrics: Dict[str, Dict[str, float]]):
         """Confusion Matrix 시각화"""
-        n_models = len(self.models) + 1  # consensus 포함
-        n_cols = 3
-        n_rows = (n_models + n_cols - 1) // n_cols
-        
-        fig, axes = plt.subplots(n_rows, n_cols, figsize=(15, 5 * n_rows))
-        axes = axes.flatten()
-        
-        for idx, model_name in enumerate(['consensus'] + self.models):
-            cm = np.array(metrics[model_name]['confusion_matrix'])
-            
-            sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', 
-                       xticklabels=['Benign', 'Harmful'],
-                       yticklabels=['Benign', 'Harmful'],
-                       ax=axes[idx], cbar=True)
-            
-            title = 'Consensus (5 models)' if model_name == 'consensus' else model_name.upper()
-            axes[idx].set_title(f'{title}\nAccuracy: {metrics[model_name]["accuracy"]:.4f}',
-                              fontweight='bold')
-            axes[idx].set_xlabel('Predicted')
-            axes[idx].set_ylabel('Actual')
-        
-        # 빈 subplot 숨기기
-        for idx in range(n_models, len(axes)):
-            axes[idx].set_visible(False)
-        
-        plt.suptitle('Confusion Matrices: Consensus vs Individual Models', 
-                    fontsize=16, fontweight='bold', y=1.00)
-        plt.tight_layout()
-        
-        output_path = os.path.join(VISUALIZATIONS_DIR, f"{self.experiment_name}_confusion_matrices.png")
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"Confusion matrices saved to: {output_path}")
-        plt.close()
-    
+        _render_confusion_matrices(metrics, self.models, self.experiment_name)
+
     def plot_category_performance(self, metrics: Dict[str, Dict[str, float]]):
         """카테고리별 성능 비교"""
-        categories = self.df['category'].unique()
-        
-        category_metrics = {}
-        for category in categories:
-            category_df = self.df[self.df['category'] == category]
-            y_true = category_df['ground_truth'].astype(int)
-            
-            category_metrics[category] = {}
-            
-            # Consensus
-            y_pred = category_df['consensus_prediction'].astype(int)
-            category_metrics[category]['consensus'] = accuracy_score(y_true, y_pred)
-            
-            # 개별 모델
-            for model in self.models:
-                y_pred_model = category_df[f'{model}_prediction'].astype(int)
-                category_metrics[category][model] = accuracy_score(y_true, y_pred_model)
-        
-        # 그래프 그리기
-        x = np.arange(len(categories))
-        width = 0.15
-        
-        fig, ax = plt.subplots(figsize=(14, 6))
-        
-        for idx, model_name in enumerate(['consensus'] + self.models):
-            accuracies = [category_metrics[cat][model_name] for cat in categories]
-            offset = width * (idx - len(self.models) / 2)
-            label = 'Consensus' if model_name == 'consensus' else model_name.upper()
-            ax.bar(x + offset, accuracies, width, label=label, alpha=0.8)
-        
-        ax.set_xlabel('Category', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Accuracy', fontsize=12, fontweight='bold')
-        ax.set_title('Accuracy by Prompt Category', fontsize=14, fontweight='bold')
-        ax.set_xticks(x)
-        ax.set_xticklabels([cat.replace('_', '\n') for cat in categories])
-        ax.legend(loc='upper right')
-        ax.grid(axis='y', alpha=0.3, linestyle='--')
-        ax.set_ylim(0, 1.1)
-        
-        plt.tight_layout()
-        
-        output_path = os.path.join(VISUALIZATIONS_DIR, f"{self.experiment_name}_category_performance.png")
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        print(f"Category performance plot saved to: {output_path}")
-        plt.close()
-    
+        categories, category_accuracy = self._category_accuracy()
+        _render_category_performance(categories, category_accuracy,
+                                     self.models, self.experiment_name)
+
     def generate_full_report(self):
         """전체 보고서 생성"""
         print(f"\n{'='*80}")
         print(f"Generating Analysis Report: {self.experiment_name}")
         print(f"{'='*80}\n")
-        
-        # 메트릭 계산
-        metrics = self.calculate_metrics()
-        
+
+        # 메트릭 계산 (cached_property라 이후 접근은 공짜)
+        metrics = self.metrics
+
         # 1. 비교 표 생성
         print("\n1. Generating comparison table...")
         comparison_df = self.generate_comparison_table(metrics)
+        # to_string은 컬럼 폭 계산이 비싸므로 한 번만 렌더링해서 재사용
+        comparison_text = comparison_df.to_string(index=False)
         print("\nComparison Table:")
-        print(comparison_df.to_string(index=False))
-        
-        # 2. 정확도 비교 그래프
-        print("\n2. Plotting accuracy comparison...")
-        self.plot_accuracy_comparison(metrics)
-        
-        # 3. 레이더 차트
-        print("\n3. Creating radar chart...")
-        self.plot_metrics_radar(metrics)
-        
-        # 4. Confusion matrices
-        print("\n4. Plotting confusion matrices...")
-        self.plot_confusion_matrices(metrics)
-        
-        # 5. 카테고리별 성능
-        print("\n5. Analyzing category performance...")
-        self.plot_category_performance(metrics)
-        
+        print(comparison_text)
+
+        # 2-5. 독립적인 플롯 4종을 워커 프로세스에서 병렬 렌더링
+        # (matplotlib 렌더링은 CPU 바운드라 프로세스 풀에서 실제로 겹쳐서 돈다)
+        print("\n2. Rendering plots (4 parallel workers)...")
+        categories, category_accuracy = self._category_accuracy()
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(_render_accuracy_comparison,
+                                metrics, self.models, self.experiment_name),
+                executor.submit(_render_metrics_radar,
+                                metrics, self.models, self.experiment_name),
+                executor.submit(_render_confusion_matrices,
+                                metrics, self.models, self.experiment_name),
+                executor.submit(_render_category_performance,
+                                categories, category_accuracy,
+                                self.models, self.experiment_name),
+            ]
+            for future in futures:
+                future.result()
+
         # 6. 텍스트 보고서 생성
         print("\n6. Generating text report...")
-        self._generate_text_report(metrics, comparison_df)
+        self._generate_text_report(metrics, comparison_text)
         
         print(f"\n{'='*80}")
         print(f"Analysis Complete!")
@@ -333,64 +430,76 @@ class ResultAnalyzer:
         print(f"Visualizations saved to: {VISUALIZATIONS_DIR}")
         print(f"{'='*80}\n")
     
-    def _generate_text_report(self, metrics: Dict, comparison_df: pd.DataFrame):
+    def _generate_text_report(self, metrics: Dict, comparison_text: str):
         """텍스트 보고서 생성"""
         report_path = os.path.join(REPORTS_DIR, f"{self.experiment_name}_report.txt")
-        
+
+        consensus_acc = metrics['consensus']['accuracy']
+        individual_accs = [metrics[m]['accuracy'] for m in self.models]
+        avg_individual = np.mean(individual_accs)
+        max_individual = max(individual_accs)
+
+        # 보고서를 라인 리스트로 조립한 뒤 한 번의 write로 기록
+        report_lines = [
+            "=" * 80,
+            "EXPERIMENT ANALYSIS REPORT",
+            f"Experiment: {self.experiment_name}",
+            f"Date: {self.experiment_data['timestamp']}",
+            "=" * 80,
+            "",
+            "1. EXPERIMENT CONFIGURATION",
+            "-" * 40,
+            f"Total Samples: {self.n_samples}",
+            f"Consensus Threshold: {self.experiment_data['consensus_threshold']}/5",
+            "Models Tested:",
+        ]
+        report_lines.extend(
+            f"  - {model}: {model_id}"
+            for model, model_id in self.experiment_data['models'].items()
+        )
+
+        report_lines += [
+            "",
+            "2. PERFORMANCE COMPARISON",
+            "-" * 40,
+            comparison_text,
+            "",
+            "3. KEY FINDINGS",
+            "-" * 40,
+            f"Consensus Accuracy: {consensus_acc:.4f}",
+            f"Average Individual Model Accuracy: {avg_individual:.4f}",
+            f"Best Individual Model Accuracy: {max_individual:.4f}",
+        ]
+
+        if avg_individual > 0:
+            report_lines.append(f"Improvement over Average: {(consensus_acc - avg_individual):.4f} ({((consensus_acc - avg_individual) / avg_individual * 100):.2f}%)")
+        else:
+            report_lines.append(f"Improvement over Average: {(consensus_acc - avg_individual):.4f}")
+
+        if max_individual > 0:
+            report_lines.append(f"Improvement over Best: {(consensus_acc - max_individual):.4f} ({((consensus_acc - max_individual) / max_individual * 100):.2f}%)")
+        else:
+            report_lines.append(f"Improvement over Best: {(consensus_acc - max_individual):.4f}")
+
+        report_lines += [
+            "",
+            "4. CATEGORY BREAKDOWN",
+            "-" * 40,
+        ]
+        # 융합 카운트 테이블 재사용 - 카테고리별 DataFrame 필터링 없음
+        categories, category_accuracy = self._category_accuracy()
+        _, joint = self._joint_counts
+        sample_counts = joint[0].sum(axis=1)
+        report_lines.extend(
+            f"{category}: {acc:.4f} ({count} samples)"
+            for category, acc, count in zip(categories, category_accuracy[0], sample_counts)
+        )
+
+        report_lines += ["", "=" * 80, ""]
+
         with open(report_path, 'w', encoding='utf-8') as f:
-            f.write("="*80 + "\n")
-            f.write(f"EXPERIMENT ANALYSIS REPORT\n")
-            f.write(f"Experiment: {self.experiment_name}\n")
-            f.write(f"Date: {self.experiment_data['timestamp']}\n")
-            f.write("="*80 + "\n\n")
-            
-            f.write("1. EXPERIMENT CONFIGURATION\n")
-            f.write("-" * 40 + "\n")
-            f.write(f"Total Samples: {len(self.results)}\n")
-            f.write(f"Consensus Threshold: {self.experiment_data['consensus_threshold']}/5\n")
-            f.write(f"Models Tested:\n")
-            for model, model_id in self.experiment_data['models'].items():
-                f.write(f"  - {model}: {model_id}\n")
-            f.write("\n")
-            
-            f.write("2. PERFORMANCE COMPARISON\n")
-            f.write("-" * 40 + "\n")
-            f.write(comparison_df.to_string(index=False))
-            f.write("\n\n")
-            
-            f.write("3. KEY FINDINGS\n")
-            f.write("-" * 40 + "\n")
-            
-            consensus_acc = metrics['consensus']['accuracy']
-            individual_accs = [metrics[m]['accuracy'] for m in self.models]
-            avg_individual = np.mean(individual_accs)
-            max_individual = max(individual_accs)
-            
-            f.write(f"Consensus Accuracy: {consensus_acc:.4f}\n")
-            f.write(f"Average Individual Model Accuracy: {avg_individual:.4f}\n")
-            f.write(f"Best Individual Model Accuracy: {max_individual:.4f}\n")
-            if avg_individual > 0:
-                f.write(f"Improvement over Average: {(consensus_acc - avg_individual):.4f} ({((consensus_acc - avg_individual) / avg_individual * 100):.2f}%)\n")
-            else:
-                f.write(f"Improvement over Average: {(consensus_acc - avg_individual):.4f}\n")
-            
-            if max_individual > 0:
-                f.write(f"Improvement over Best: {(consensus_acc - max_individual):.4f} ({((consensus_acc - max_individual) / max_individual * 100):.2f}%)\n")
-            else:
-                f.write(f"Improvement over Best: {(consensus_acc - max_individual):.4f}\n")
-            f.write("\n")
-            
-            f.write("4. CATEGORY BREAKDOWN\n")
-            f.write("-" * 40 + "\n")
-            for category in self.df['category'].unique():
-                category_df = self.df[self.df['category'] == category]
-                y_true = category_df['ground_truth'].astype(int)
-                y_pred = category_df['consensus_prediction'].astype(int)
-                acc = accuracy_score(y_true, y_pred)
-                f.write(f"{category}: {acc:.4f} ({len(category_df)} samples)\n")
-            
-            f.write("\n" + "="*80 + "\n")
-        
+            f.write("\n".join(report_lines))
+
         print(f"Text report saved to: {report_path}")
 
 
@@ -3,16 +3,8 @@ Full Experiment Runner
 전체 실험 실행 및 분석 자동화
 """
 import os
-import sys
 from datetime import datetime
-from dotenv import load_dotenv
 
-# 환경 변수 로드
-load_dotenv('../backend/.env')
-
-from data_loader import WildJailbreakLoader
-from experiment_runner import ExperimentRunner
-from result_analyzer import ResultAnalyzer
 from config import FREE_MODELS, PREMIUM_MODELS, TOTAL_SAMPLES, RAW_DATA_DIR
 
 
@@ -29,6 +21,12 @@ def run_full_experiment(
         models: 사용할 모델 딕셔너리
         experiment_name: 실험 이름
     """
+    # 무거운 모듈(datasets/httpx/분석 스택)은 실제 실행 시점에만 로드
+    # - argparse --help나 인자 오류는 import 비용 없이 바로 반환됨
+    from data_loader import WildJailbreakLoader
+    from experiment_runner import ExperimentRunner
+    from result_analyzer import ResultAnalyzer
+
     if experiment_name is None:
         experiment_name = f"free_models_{total_samples}_samples_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     
@@ -5,15 +5,25 @@ Blockchain Performance 결과 분석 및 시각화
 테스트 결과를 분석하고 그래프와 리포트를 생성합니다.
 """
 
+import functools
 import json
 import argparse
+
+try:
+    # 수치 위주의 대용량 결과 JSON은 orjson이 수 배 빠르게 파싱함
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson 미설치 환경에서는 stdlib으로 폴백
+    _json_loads = json.loads
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Any
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib
+import matplotlib.cbook as cbook
 matplotlib.use('Agg')  # GUI 없이 그래프 생성
 
 # 한글 폰트 설정 (MacOS)
@@ -21,64 +31,204 @@ plt.rcParams['font.family'] = 'AppleGothic'
 plt.rcParams['axes.unicode_minus'] = False
 
 
+# ---------------------------------------------------------------------------
+# 플롯 렌더러 (모듈 레벨 함수)
+# ProcessPoolExecutor 워커로 넘기려면 picklable해야 하므로 bound method가 아닌
+# ndarray만 인자로 받는 최상위 함수로 분리함. 각 워커 프로세스가 자기 Figure를
+# 만들어 쓰기 때문에 프로세스 간 공유 상태가 없음.
+# ---------------------------------------------------------------------------
+
+def _render_distribution(data: np.ndarray, stats: Dict[str, float],
+                         title: str, xlabel: str, ylabel: str, filename: str,
+                         dpi: int = 100):
+    """히스토그램 그리기"""
+    fig, ax = plt.subplots(figsize=(10, 6))
+    # 구간화는 NumPy C 레벨에서 미리 수행하고 결과만 bar로 그림
+    counts, edges = np.histogram(data, bins=20)
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+           edgecolor='black', alpha=0.7)
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.set_xlabel(xlabel, fontsize=12)
+    ax.set_ylabel(ylabel, fontsize=12)
+    ax.grid(axis='y', alpha=0.3)
+
+    # 통계 정보 추가 (리포트에서 이미 계산된 캐시 재사용)
+    textstr = f"Mean: {stats['mean']:.3f}\nMedian: {stats['median']:.3f}\nStd: {stats['std']:.3f}"
+    ax.text(0.7, 0.95, textstr, transform=ax.transAxes,
+            fontsize=10, verticalalignment='top',
+            bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+
+    fig.tight_layout()
+    fig.savefig(filename, dpi=dpi)
+    plt.close(fig)
+    print(f"📊 Saved: {filename}")
+
+
+def _render_latency_over_time(test_numbers: np.ndarray, commit_times: np.ndarray,
+                              verification_times: np.ndarray, filename: str):
+    """시간에 따른 latency 변화 그래프"""
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.plot(test_numbers, commit_times, marker='o', label='Commit Latency', linewidth=2)
+    ax.plot(test_numbers, verification_times, marker='s', label='Verification Latency', linewidth=2)
+    ax.set_title('Latency Over Time', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Test Number', fontsize=12)
+    ax.set_ylabel('Time (seconds)', fontsize=12)
+    ax.legend(fontsize=10)
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    # 선 그래프는 벡터(SVG)로 저장 - 래스터화/PNG 인코딩 비용이 없음
+    fig.savefig(filename)
+    plt.close(fig)
+    print(f"📊 Saved: {filename}")
+
+
+def _render_latency_boxplot(commit_times: np.ndarray, verification_times: np.ndarray,
+                            tx_submission_times: np.ndarray, tx_confirmation_times: np.ndarray,
+                            filename: str, dpi: int = 100):
+    """Latency 비교 Box Plot"""
+    fig, ax = plt.subplots(figsize=(12, 7))
+
+    data_to_plot = [
+        commit_times,
+        verification_times,
+        tx_submission_times,
+        tx_confirmation_times
+    ]
+    labels = ['Total Commit', 'Verification', 'TX Submission', 'TX Confirmation']
+
+    # 박스 통계를 미리 계산해서 전달 - matplotlib 내부의 시리즈별 재정렬 생략
+    bxpstats = [cbook.boxplot_stats(d, labels=[label])[0]
+                for d, label in zip(data_to_plot, labels)]
+    bp = ax.bxp(bxpstats, patch_artist=True)
+
+    # 색상 설정
+    colors = ['lightblue', 'lightgreen', 'lightyellow', 'lightcoral']
+    for patch, color in zip(bp['boxes'], colors):
+        patch.set_facecolor(color)
+
+    ax.set_title('Latency Comparison (Box Plot)', fontsize=14, fontweight='bold')
+    ax.set_ylabel('Time (seconds)', fontsize=12)
+    ax.grid(axis='y', alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(filename, dpi=dpi)
+    plt.close(fig)
+    print(f"📊 Saved: {filename}")
+
+
+def _render_l2_cost_comparison(cost_analysis: Dict[str, Any], filename: str):
+    """Layer 2 cost 비교 bar chart"""
+    l1_cost = cost_analysis['l1_mainnet']['total_cost_usd']
+    l2_networks = cost_analysis['l2_networks']
+
+    networks = ['L1 (Ethereum)'] + [net.upper() for net in l2_networks.keys()]
+    costs = [l1_cost] + [data['estimated_cost_usd'] for data in l2_networks.values()]
+    colors = ['red'] + ['green'] * len(l2_networks)
+
+    fig, ax = plt.subplots(figsize=(12, 7))
+    bars = ax.bar(networks, costs, color=colors, alpha=0.7, edgecolor='black')
+
+    # 값 표시
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'${height:.4f}',
+                ha='center', va='bottom', fontsize=10)
+
+    ax.set_title('Layer 2 Cost Comparison (Per Transaction)', fontsize=14, fontweight='bold')
+    ax.set_ylabel('Cost (USD)', fontsize=12)
+    ax.set_xlabel('Network', fontsize=12)
+    ax.tick_params(axis='x', rotation=45)
+    ax.grid(axis='y', alpha=0.3)
+    fig.tight_layout()
+    # 막대 그래프도 벡터(SVG)로 저장
+    fig.savefig(filename)
+    plt.close(fig)
+    print(f"📊 Saved: {filename}")
+
+
 class BlockchainPerformanceAnalyzer:
     """블록체인 성능 분석기"""
     
     def __init__(self, results: List[Dict[str, Any]]):
         self.results = results
-        self.successful_results = [r for r in results if r.get('success')]
+        # 이후로 변경되지 않는 목록이므로 tuple로 고정 (메모리/순회 모두 유리)
+        self.successful_results = tuple(r for r in results if r.get('success'))
         
         if not self.successful_results:
             raise ValueError("No successful test results to analyze")
-    
-    def extract_metrics(self) -> Dict[str, List[float]]:
-        """테스트 결과에서 주요 메트릭 추출"""
-        metrics = {
-            'commit_times': [],
-            'verification_times': [],
-            'tx_submission_times': [],
-            'tx_confirmation_times': [],
-            'gas_used': [],
-            'gas_price_gwei': [],
-            'gas_cost_eth': [],
-            'test_numbers': []
-        }
-        
-        for result in self.successful_results:
-            commit = result.get('commit', {})
-            timing = commit.get('timing', {})
-            verification = result.get('verification', {})
-            verify_timing = verification.get('timing', {})
-            
-            metrics['test_numbers'].append(result['test_number'])
-            metrics['commit_times'].append(timing.get('total_commit_time', 0))
-            metrics['tx_submission_times'].append(timing.get('tx_submission_time', 0))
-            metrics['tx_confirmation_times'].append(timing.get('tx_confirmation_time', 0))
-            metrics['verification_times'].append(verify_timing.get('total_verification_time', 0))
-            metrics['gas_used'].append(commit.get('gas_used', 0))
-            metrics['gas_price_gwei'].append(commit.get('gas_price_gwei', 0))
-            metrics['gas_cost_eth'].append(commit.get('gas_cost_eth', 0))
-        
+
+        self._stats_cache = {}
+
+    def extract_metrics(self) -> Dict[str, np.ndarray]:
+        """테스트 결과에서 주요 메트릭 추출 (최초 1회만 계산됨)"""
+        return self.metrics
+
+    @functools.cached_property
+    def metrics(self) -> Dict[str, np.ndarray]:
+        """주요 메트릭 배열 - 첫 접근 시 계산되고 인스턴스에 캐시됨"""
+        # 리스트 append 대신 크기를 아는 배열을 미리 할당하고 인덱스로 기록
+        n = len(self.successful_results)
+        names = ('test_numbers', 'commit_times', 'tx_submission_times',
+                 'tx_confirmation_times', 'verification_times',
+                 'gas_used', 'gas_price_gwei', 'gas_cost_eth')
+        metrics = {name: np.empty(n, dtype=np.float64) for name in names}
+
+        for i, result in enumerate(self.successful_results):
+            # 성공 결과는 commit/timing을 거의 항상 가지므로 EAFP 직접 인덱싱이
+            # .get 체인보다 빠름 (행마다 빈 dict 임시 할당 제거)
+            try:
+                commit = result['commit']
+            except KeyError:
+                commit = {}
+            # timing만 없는 결과에서도 commit의 gas 필드는 유지
+            try:
+                timing = commit['timing']
+            except KeyError:
+                timing = {}
+            try:
+                verify_timing = result['verification']['timing']
+            except KeyError:
+                verify_timing = {}
+
+            metrics['test_numbers'][i] = result['test_number']
+            metrics['commit_times'][i] = timing.get('total_commit_time', 0)
+            metrics['tx_submission_times'][i] = timing.get('tx_submission_time', 0)
+            metrics['tx_confirmation_times'][i] = timing.get('tx_confirmation_time', 0)
+            metrics['verification_times'][i] = verify_timing.get('total_verification_time', 0)
+            metrics['gas_used'][i] = commit.get('gas_used', 0)
+            metrics['gas_price_gwei'][i] = commit.get('gas_price_gwei', 0)
+            metrics['gas_cost_eth'][i] = commit.get('gas_cost_eth', 0)
+
         return metrics
-    
-    def calculate_statistics(self, data: List[float]) -> Dict[str, float]:
+
+    def calculate_statistics(self, data: np.ndarray) -> Dict[str, float]:
         """통계 계산"""
-        if not data:
-            return {}
-        
+        # __init__에서 성공 결과가 비어있지 않음을 보장하므로 빈 배열 분기 불필요
+        data = np.asarray(data, dtype=np.float64)
+
+        # 분위수 3개를 한 번에 계산 - percentile 호출마다 배열을 다시 정렬하지 않음
+        q1, median, q3 = np.percentile(data, [25, 50, 75])
+
         return {
-            'mean': np.mean(data),
-            'median': np.median(data),
-            'std': np.std(data),
-            'min': np.min(data),
-            'max': np.max(data),
-            'q1': np.percentile(data, 25),
-            'q3': np.percentile(data, 75)
+            'mean': data.mean(),
+            'median': median,
+            'std': data.std(),
+            'min': data.min(),
+            'max': data.max(),
+            'q1': q1,
+            'q3': q3
         }
+
+    def stats(self, name: str) -> Dict[str, float]:
+        """메트릭 이름 기준 통계 메모이즈 - 리포트와 플롯이 같은 계산을 공유"""
+        cached = self._stats_cache.get(name)
+        if cached is None:
+            cached = self._stats_cache[name] = self.calculate_statistics(self.metrics[name])
+        return cached
     
     def generate_summary_report(self, output_dir: str):
         """요약 리포트 생성"""
-        metrics = self.extract_metrics()
+        metrics = self.metrics
         
         report_lines = []
         report_lines.append("=" * 80)
@@ -91,7 +241,7 @@ class BlockchainPerformanceAnalyzer:
         report_lines.append("")
         
         # Commit Latency 통계
-        commit_stats = self.calculate_statistics(metrics['commit_times'])
+        commit_stats = self.stats('commit_times')
         report_lines.append("=" * 80)
         report_lines.append("COMMIT LATENCY (Sepolia Testnet)")
         report_lines.append("=" * 80)
@@ -105,15 +255,15 @@ class BlockchainPerformanceAnalyzer:
         report_lines.append("")
         
         # TX Submission vs Confirmation 분해
-        tx_sub_stats = self.calculate_statistics(metrics['tx_submission_times'])
-        tx_conf_stats = self.calculate_statistics(metrics['tx_confirmation_times'])
+        tx_sub_stats = self.stats('tx_submission_times')
+        tx_conf_stats = self.stats('tx_confirmation_times')
         report_lines.append("  Breakdown:")
         report_lines.append(f"    - TX Submission (Avg):   {tx_sub_stats['mean']:.3f}s")
         report_lines.append(f"    - TX Confirmation (Avg): {tx_conf_stats['mean']:.3f}s")
         report_lines.append("")
         
         # Verification Latency 통계
-        verify_stats = self.calculate_statistics(metrics['verification_times'])
+        verify_stats = self.stats('verification_times')
         report_lines.append("=" * 80)
         report_lines.append("VERIFICATION LATENCY (Etherscan API)")
         report_lines.append("=" * 80)
@@ -125,9 +275,9 @@ class BlockchainPerformanceAnalyzer:
         report_lines.append("")
         
         # Gas Cost 통계
-        gas_used_stats = self.calculate_statistics(metrics['gas_used'])
-        gas_price_stats = self.calculate_statistics(metrics['gas_price_gwei'])
-        gas_cost_stats = self.calculate_statistics(metrics['gas_cost_eth'])
+        gas_used_stats = self.stats('gas_used')
+        gas_price_stats = self.stats('gas_price_gwei')
+        gas_cost_stats = self.stats('gas_cost_eth')
         
         report_lines.append("=" * 80)
         report_lines.append("GAS USAGE AND COSTS (Sepolia Testnet)")
@@ -136,7 +286,7 @@ class BlockchainPerformanceAnalyzer:
         report_lines.append(f"Gas Used (Min/Max):  {gas_used_stats['min']:.0f} / {gas_used_stats['max']:.0f} gas")
         report_lines.append(f"Gas Price (Avg):     {gas_price_stats['mean']:.2f} Gwei")
         report_lines.append(f"Cost per TX (Avg):   {gas_cost_stats['mean']:.6f} ETH")
-        report_lines.append(f"Total Cost:          {sum(metrics['gas_cost_eth']):.6f} ETH")
+        report_lines.append(f"Total Cost:          {metrics['gas_cost_eth'].sum():.6f} ETH")
         report_lines.append("")
         
         # Layer 2 Cost Estimation
@@ -162,10 +312,13 @@ class BlockchainPerformanceAnalyzer:
                 l2_networks = cost_analysis.get('l2_networks', {})
                 if l2_networks:
                     report_lines.append("Layer 2 Networks (estimated):")
-                    for network, data in l2_networks.items():
-                        report_lines.append(f"  {network.upper()}:")
-                        report_lines.append(f"    - Cost per TX: ${data['estimated_cost_usd']:.4f} USD")
-                        report_lines.append(f"    - Cost Reduction: {data['cost_reduction_percent']:.1f}%")
+                    # 네트워크별 블록을 join 한 번으로 조립 (append 반복 제거)
+                    report_lines.append("\n".join(
+                        f"  {network.upper()}:\n"
+                        f"    - Cost per TX: ${data['estimated_cost_usd']:.4f} USD\n"
+                        f"    - Cost Reduction: {data['cost_reduction_percent']:.1f}%"
+                        for network, data in l2_networks.items()
+                    ))
                     report_lines.append("")
                 
                 cheapest = cost_analysis.get('cheapest_l2', {})
@@ -187,166 +340,97 @@ class BlockchainPerformanceAnalyzer:
         # 파일에 저장
         os.makedirs(os.path.join(output_dir, 'reports'), exist_ok=True)
         report_path = os.path.join(output_dir, 'reports', 'performance_summary.txt')
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(report_lines))
+        # 전체를 한 문자열로 join하지 않고 버퍼드 스트리밍으로 기록 (피크 메모리 일정)
+        with open(report_path, 'w', encoding='utf-8', buffering=64 * 1024) as f:
+            f.writelines(line + '\n' for line in report_lines)
         
         print('\n'.join(report_lines))
         print(f"\n📄 Report saved: {report_path}")
         
         return report_path
     
-    def generate_visualizations(self, output_dir: str):
-        """시각화 그래프 생성"""
-        metrics = self.extract_metrics()
-        os.makedirs(os.path.join(output_dir, 'visualizations'), exist_ok=True)
-        
-        # 1. Commit Latency Distribution
-        self._plot_distribution(
-            data=metrics['commit_times'],
-            title='Commit Latency Distribution',
-            xlabel='Commit Time (seconds)',
-            ylabel='Frequency',
-            filename=os.path.join(output_dir, 'visualizations', 'commit_latency_distribution.png')
-        )
-        
-        # 2. Verification Latency Distribution
-        self._plot_distribution(
-            data=metrics['verification_times'],
-            title='Verification Latency Distribution',
-            xlabel='Verification Time (seconds)',
-            ylabel='Frequency',
-            filename=os.path.join(output_dir, 'visualizations', 'verification_latency_distribution.png')
-        )
-        
-        # 3. Latency Over Time (Line Chart)
-        self._plot_latency_over_time(
-            test_numbers=metrics['test_numbers'],
-            commit_times=metrics['commit_times'],
-            verification_times=metrics['verification_times'],
-            filename=os.path.join(output_dir, 'visualizations', 'latency_over_time.png')
-        )
-        
-        # 4. Latency Box Plot (Comparison)
-        self._plot_latency_boxplot(
-            commit_times=metrics['commit_times'],
-            verification_times=metrics['verification_times'],
-            tx_submission_times=metrics['tx_submission_times'],
-            tx_confirmation_times=metrics['tx_confirmation_times'],
-            filename=os.path.join(output_dir, 'visualizations', 'latency_comparison_boxplot.png')
-        )
-        
-        # 5. Gas Cost Distribution
-        self._plot_distribution(
-            data=metrics['gas_cost_eth'],
-            title='Gas Cost Distribution',
-            xlabel='Cost (ETH)',
-            ylabel='Frequency',
-            filename=os.path.join(output_dir, 'visualizations', 'gas_cost_distribution.png')
-        )
-        
-        # 6. Layer 2 Cost Comparison
-        if self.successful_results and self.successful_results[0].get('cost_analysis'):
-            self._plot_l2_cost_comparison(
-                cost_analysis=self.successful_results[0]['cost_analysis'],
-                filename=os.path.join(output_dir, 'visualizations', 'l2_cost_comparison.png')
-            )
-        
+    def generate_visualizations(self, output_dir: str, plots: List[str] = None):
+        """시각화 그래프 생성
+
+        Args:
+            plots: 생성할 플롯 이름 목록 (None 또는 'all' 포함 시 전체 생성)
+        """
+        metrics = self.metrics
+        viz_dir = os.path.join(output_dir, 'visualizations')
+        os.makedirs(viz_dir, exist_ok=True)
+
+        # 플롯 이름 → (렌더 함수, 인자) 매핑 (--plots 인자로 필요한 것만 선택 가능)
+        # 렌더 함수는 모듈 레벨이라 picklable - 프로세스 풀 워커로 바로 넘김
+        plot_jobs = {
+            'commit_latency': (_render_distribution, dict(
+                data=metrics['commit_times'],
+                stats=self.stats('commit_times'),
+                title='Commit Latency Distribution',
+                xlabel='Commit Time (seconds)',
+                ylabel='Frequency',
+                filename=os.path.join(viz_dir, 'commit_latency_distribution.png')
+            )),
+            'verification_latency': (_render_distribution, dict(
+                data=metrics['verification_times'],
+                stats=self.stats('verification_times'),
+                title='Verification Latency Distribution',
+                xlabel='Verification Time (seconds)',
+                ylabel='Frequency',
+                filename=os.path.join(viz_dir, 'verification_latency_distribution.png')
+            )),
+            'latency_over_time': (_render_latency_over_time, dict(
+                test_numbers=metrics['test_numbers'],
+                commit_times=metrics['commit_times'],
+                verification_times=metrics['verification_times'],
+                filename=os.path.join(viz_dir, 'latency_over_time.svg')
+            )),
+            'latency_boxplot': (_render_latency_boxplot, dict(
+                commit_times=metrics['commit_times'],
+                verification_times=metrics['verification_times'],
+                tx_submission_times=metrics['tx_submission_times'],
+                tx_confirmation_times=metrics['tx_confirmation_times'],
+                filename=os.path.join(viz_dir, 'latency_comparison_boxplot.png')
+            )),
+            'gas_cost': (_render_distribution, dict(
+                data=metrics['gas_cost_eth'],
+                stats=self.stats('gas_cost_eth'),
+                title='Gas Cost Distribution',
+                xlabel='Cost (ETH)',
+                ylabel='Frequency',
+                filename=os.path.join(viz_dir, 'gas_cost_distribution.png')
+            )),
+            'l2_cost': (_render_l2_cost_comparison, dict(
+                cost_analysis=self.successful_results[0].get('cost_analysis'),
+                filename=os.path.join(viz_dir, 'l2_cost_comparison.svg')
+            )),
+        }
+
+        # 요청되지 않은 플롯은 렌더링 자체를 건너뜀 (CI에서 일부만 필요할 때)
+        if plots and 'all' not in plots:
+            unknown = set(plots) - plot_jobs.keys()
+            if unknown:
+                print(f"⚠️ Unknown plot names skipped: {', '.join(sorted(unknown))}")
+            plot_jobs = {name: job for name, job in plot_jobs.items() if name in plots}
+
+        # cost_analysis가 없는 결과에서는 L2 비교 플롯 생략 (기존 동작 유지)
+        if not self.successful_results[0].get('cost_analysis'):
+            plot_jobs.pop('l2_cost', None)
+
+        # 필터링 결과 렌더링할 플롯이 없으면 풀 생성 없이 종료
+        # (max_workers=0은 ValueError)
+        if not plot_jobs:
+            print("⚠️ No plots to render for the requested selection")
+            return
+
+        # 각 플롯은 독립적으로 별도 파일에 기록되므로 프로세스 풀에서 병렬 렌더링
+        # (Agg 백엔드의 PNG 인코딩/텍스트 렌더링은 CPU 바운드)
+        with ProcessPoolExecutor(max_workers=min(len(plot_jobs), os.cpu_count() or 1)) as executor:
+            futures = [executor.submit(render, **kwargs)
+                       for render, kwargs in plot_jobs.values()]
+            for future in futures:
+                future.result()
+
         print("\n✅ All visualizations generated!")
-    
-    def _plot_distribution(self, data: List[float], title: str, xlabel: str, ylabel: str, filename: str):
-        """히스토그램 그리기"""
-        plt.figure(figsize=(10, 6))
-        plt.hist(data, bins=20, edgecolor='black', alpha=0.7)
-        plt.title(title, fontsize=14, fontweight='bold')
-        plt.xlabel(xlabel, fontsize=12)
-        plt.ylabel(ylabel, fontsize=12)
-        plt.grid(axis='y', alpha=0.3)
-        
-        # 통계 정보 추가
-        stats = self.calculate_statistics(data)
-        textstr = f"Mean: {stats['mean']:.3f}\nMedian: {stats['median']:.3f}\nStd: {stats['std']:.3f}"
-        plt.text(0.7, 0.95, textstr, transform=plt.gca().transAxes,
-                fontsize=10, verticalalignment='top',
-                bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
-        
-        plt.tight_layout()
-        plt.savefig(filename, dpi=150)
-        plt.close()
-        print(f"📊 Saved: {filename}")
-    
-    def _plot_latency_over_time(self, test_numbers: List[int], commit_times: List[float],
-                                verification_times: List[float], filename: str):
-        """시간에 따른 latency 변화 그래프"""
-        plt.figure(figsize=(12, 6))
-        plt.plot(test_numbers, commit_times, marker='o', label='Commit Latency', linewidth=2)
-        plt.plot(test_numbers, verification_times, marker='s', label='Verification Latency', linewidth=2)
-        plt.title('Latency Over Time', fontsize=14, fontweight='bold')
-        plt.xlabel('Test Number', fontsize=12)
-        plt.ylabel('Time (seconds)', fontsize=12)
-        plt.legend(fontsize=10)
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        plt.savefig(filename, dpi=150)
-        plt.close()
-        print(f"📊 Saved: {filename}")
-    
-    def _plot_latency_boxplot(self, commit_times: List[float], verification_times: List[float],
-                              tx_submission_times: List[float], tx_confirmation_times: List[float],
-                              filename: str):
-        """Latency 비교 Box Plot"""
-        plt.figure(figsize=(12, 7))
-        
-        data_to_plot = [
-            commit_times,
-            verification_times,
-            tx_submission_times,
-            tx_confirmation_times
-        ]
-        labels = ['Total Commit', 'Verification', 'TX Submission', 'TX Confirmation']
-        
-        bp = plt.boxplot(data_to_plot, labels=labels, patch_artist=True)
-        
-        # 색상 설정
-        colors = ['lightblue', 'lightgreen', 'lightyellow', 'lightcoral']
-        for patch, color in zip(bp['boxes'], colors):
-            patch.set_facecolor(color)
-        
-        plt.title('Latency Comparison (Box Plot)', fontsize=14, fontweight='bold')
-        plt.ylabel('Time (seconds)', fontsize=12)
-        plt.grid(axis='y', alpha=0.3)
-        plt.tight_layout()
-        plt.savefig(filename, dpi=150)
-        plt.close()
-        print(f"📊 Saved: {filename}")
-    
-    def _plot_l2_cost_comparison(self, cost_analysis: Dict[str, Any], filename: str):
-        """Layer 2 cost 비교 bar chart"""
-        l1_cost = cost_analysis['l1_mainnet']['total_cost_usd']
-        l2_networks = cost_analysis['l2_networks']
-        
-        networks = ['L1 (Ethereum)'] + [net.upper() for net in l2_networks.keys()]
-        costs = [l1_cost] + [data['estimated_cost_usd'] for data in l2_networks.values()]
-        colors = ['red'] + ['green'] * len(l2_networks)
-        
-        plt.figure(figsize=(12, 7))
-        bars = plt.bar(networks, costs, color=colors, alpha=0.7, edgecolor='black')
-        
-        # 값 표시
-        for bar in bars:
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height,
-                    f'${height:.4f}',
-                    ha='center', va='bottom', fontsize=10)
-        
-        plt.title('Layer 2 Cost Comparison (Per Transaction)', fontsize=14, fontweight='bold')
-        plt.ylabel('Cost (USD)', fontsize=12)
-        plt.xlabel('Network', fontsize=12)
-        plt.xticks(rotation=45, ha='right')
-        plt.grid(axis='y', alpha=0.3)
-        plt.tight_layout()
-        plt.savefig(filename, dpi=150)
-        plt.close()
-        print(f"📊 Saved: {filename}")
 
 
 def main():
@@ -356,7 +440,12 @@ def main():
                         help='Path to JSON result file')
     parser.add_argument('--output', type=str, default=None,
                         help='Output directory (default: same as input directory)')
-    
+    parser.add_argument('--plots', nargs='+', default=['all'],
+                        choices=['all', 'commit_latency', 'verification_latency',
+                                 'latency_over_time', 'latency_boxplot',
+                                 'gas_cost', 'l2_cost'],
+                        help='Which plots to generate (default: all)')
+
     args = parser.parse_args()
     
     # 입력 파일 읽기
@@ -364,8 +453,8 @@ def main():
         print(f"❌ Error: Input file not found: {args.input}")
         sys.exit(1)
     
-    with open(args.input, 'r', encoding='utf-8') as f:
-        results = json.load(f)
+    with open(args.input, 'rb') as f:
+        results = _json_loads(f.read())
     
     print(f"📂 Loaded {len(results)} test results from: {args.input}")
     
@@ -392,7 +481,7 @@ def main():
         print("\n" + "="*80)
         print("📈 Generating Visualizations...")
         print("="*80)
-        analyzer.generate_visualizations(output_dir)
+        analyzer.generate_visualizations(output_dir, plots=args.plots)
         
         print("\n✅ Analysis completed successfully!")
         print(f"📁 Results saved to: {output_dir}")
@@ -1,20 +1,54 @@
-from flask import Flask
+import logging
+
+from flask import Flask, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
 from config import config
 
+from app.routes.llm_routes import llm_bp
+from app.routes.verification_routes import verification_bp
+
+try:
+    # 긴 LLM 응답/consensus dict의 JSON 인코딩을 C 레벨에서 수행
+    import orjson
+
+    class ORJSONProvider(JSONProvider):
+        """orjson 기반 JSON provider - jsonify/request.get_json이 그대로 사용"""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+except ImportError:  # orjson 미설치 환경에서는 stdlib provider 유지
+    ORJSONProvider = None
+
 def create_app(config_name='default'):
     """Flask 애플리케이션 팩토리"""
+    # DEBUG 비활성 시 라우트의 logger.debug 포맷 인자가 평가되지 않음
+    logging.basicConfig(level=logging.INFO)
+
     app = Flask(__name__)
     app.config.from_object(config[config_name])
-    
+
+    if ORJSONProvider is not None:
+        app.json = ORJSONProvider(app)
+
     # 확장 초기화
     CORS(app, origins=app.config['CORS_ORIGINS'])
-    
+
     # 블루프린트 등록
-    from app.routes.llm_routes import llm_bp
-    from app.routes.verification_routes import verification_bp
-    
     app.register_blueprint(llm_bp, url_prefix='/api/llm')
     app.register_blueprint(verification_bp, url_prefix='/api/verification')
-    
+
+    # 라우트의 typed except를 빠져나온 예외의 최종 안전망
+    # (스택 트레이스는 로그에만 남기고 응답에는 노출하지 않음)
+    @app.errorhandler(Exception)
+    def handle_unexpected_error(e):
+        if isinstance(e, HTTPException):
+            return e
+        app.logger.exception("Unhandled exception")
+        return jsonify({'error': 'internal'}), 500
+
     return app
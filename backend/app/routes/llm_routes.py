@@ -1,121 +1,246 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import hashlib
+import json
+import threading
+import time
+import uuid
 from app.services.llm_service import LLMService
 from app.services.hash_service import HashService
-from app.services.blockchain_service import BlockchainService
+from app.services.blockchain_service import get_blockchain_service
 from app.services.consensus_service import ConsensusService
 from config import Config
 
 llm_bp = Blueprint('llm', __name__)
 
+# 요청 검증 스키마 (요청마다 리스트를 새로 만들지 않도록 모듈 상수로 고정)
+_REQUIRED_GENERATE_FIELDS = ('provider', 'model', 'prompt')
+
+# 백그라운드/병렬 작업용 공용 풀 (블록체인 커밋, consensus·LLM 동시 호출)
+_background_executor = ThreadPoolExecutor(max_workers=8)
+# 해시값 → 커밋 결과 (워커가 완료 시 기록, /commit-status로 조회)
+_commit_results = {}
+
+# 비동기 잡 모드용 풀 - 잡이 내부에서 _background_executor에 하위 작업을
+# 제출하므로 같은 풀을 쓰면 서로 기다리다 교착될 수 있어 분리함
+_job_executor = ThreadPoolExecutor(max_workers=4)
+# job_id → {'status': 'queued'|'done'|'error', ...}
+_jobs = {}
+
+# 장시간 구동 시 두 맵이 무한 증식하지 않도록 _verify_cache와 같은
+# 상한 + 최장기 항목 축출을 적용 (항목은 조회용 결과이므로 밀려나도 무방)
+_RESULTS_MAX = 1000
+_results_lock = threading.Lock()
+
+
+def _store_capped(store, key, value):
+    """상한 도달 시 가장 오래된 항목을 밀어내고 기록 (dict는 삽입 순서 유지)"""
+    with _results_lock:
+        if key not in store and len(store) >= _RESULTS_MAX:
+            store.pop(next(iter(store)))
+        store[key] = value
+
+
+def _do_commit(hash_value, prompt, content, provider, model,
+               timestamp, parameters, consensus_votes):
+    """백그라운드 워커: 블록체인 커밋 후 결과를 해시값 기준으로 기록"""
+    try:
+        blockchain_service = get_blockchain_service()
+        commit_result = blockchain_service.commit_hash(
+            hash_value,
+            prompt,
+            content,
+            provider,
+            model,
+            timestamp,
+            parameters,
+            consensus_votes,
+            wait_for_confirmation=False  # TX submission만, confirmation은 대기하지 않음
+        )
+    except Exception as e:
+        commit_result = {'status': 'error', 'error_message': str(e)}
+    _store_capped(_commit_results, hash_value, commit_result)
+    return commit_result
+
+def _generate_pipeline(provider, model, prompt, parameters, commit_to_blockchain):
+    """
+    consensus → LLM → 해시 → 커밋 파이프라인 (동기 라우트/비동기 잡 공용)
+
+    Returns:
+        dict: 응답 payload (consensus 거부 시 consensus_only 형태)
+    """
+    # 1+2. Consensus 검증과 LLM 호출을 동시에 시작
+    # 둘 다 독립적인 네트워크 I/O이므로 직렬화하면 지연이 두 배가 됨
+    consensus_service = ConsensusService()
+    llm_service = LLMService()
+    consensus_future = _background_executor.submit(
+        consensus_service.run_consensus_validation, prompt)
+    llm_future = _background_executor.submit(
+        llm_service.call_llm, provider, model, prompt, parameters)
+
+    consensus_result = consensus_future.result()
+
+    # Consensus 검증 실패 시 결과만 반환 (에러가 아닌 정상 응답)
+    if not consensus_result['consensus_passed']:
+        # 아직 시작 전이면 LLM 호출 취소 (이미 전송됐다면 한 번의 호출 비용 감수)
+        llm_future.cancel()
+        return {
+            'success': True,
+            'consensus_only': True,
+            'consensus_result': consensus_result,
+            'message': consensus_result['consensus_message']
+        }
+
+    llm_response = llm_future.result()
+
+    # 3. 해시 생성 (consensus 정보 포함)
+    hash_service = HashService()
+    timestamp = datetime.utcnow()  # timestamp 변수로 저장
+    hash_value = hash_service.generate_hash(
+        llm_provider=provider,
+        model_name=model,
+        prompt=prompt,
+        response=llm_response['content'],
+        parameters=parameters,
+        timestamp=timestamp,
+        consensus_votes=f"{consensus_result['safe_votes']}/{consensus_result['total_models']}"
+    )
+
+    result = {
+        'request_id': llm_response['request_id'],
+        'content': llm_response['content'],
+        'hash_value': hash_value,
+        'response_time': llm_response['response_time'],
+        'model': model,
+        'provider': provider,
+        'consensus_result': consensus_result
+    }
+
+    # 4. 블록체인에 커밋 (백그라운드 - 클라이언트는 RPC 왕복을 기다리지 않음)
+    if commit_to_blockchain and Config.CONTRACT_ADDRESS:
+        # 해시 생성 시 사용된 정확한 timestamp와 consensus_votes 전달
+        # timestamp를 그대로 전달 (마이크로초 포함)
+        consensus_votes_str = f"{consensus_result['safe_votes']}/{consensus_result['total_models']}"
+
+        _background_executor.submit(
+            _do_commit,
+            hash_value,
+            prompt,
+            llm_response['content'],
+            provider,
+            model,
+            timestamp,  # datetime 객체 그대로 전달
+            parameters,  # 파라미터 전달
+            consensus_votes_str
+        )
+        # 트랜잭션 해시는 /commit-status/<hash_value>로 조회
+        result['blockchain_commit'] = {'status': 'queued'}
+
+    return result
+
+
+def _run_generation_job(job_id, provider, model, prompt, parameters, commit_to_blockchain):
+    """백그라운드 잡 워커: 파이프라인 전체를 실행하고 상태를 기록"""
+    try:
+        result = _generate_pipeline(provider, model, prompt, parameters, commit_to_blockchain)
+        _store_capped(_jobs, job_id, {'status': 'done', 'result': result})
+    except Exception as e:
+        _store_capped(_jobs, job_id, {'status': 'error', 'error': str(e)})
+
+
 @llm_bp.route('/generate', methods=['POST'])
 def generate_with_verification():
     """
     LLM 응답 생성 및 검증 해시 커밋 (Consensus 검증 포함)
+
+    'async': true를 보내면 202 + job_id를 즉시 반환하고
+    GET /generate/<job_id>로 결과를 폴링함 (워커 점유 시간 최소화)
     """
     try:
-        data = request.get_json()
-        
-        # 필수 필드 검증
-        required_fields = ['provider', 'model', 'prompt']
-        for field in required_fields:
+        # 본문은 여기서 한 번만 파싱 (orjson provider 사용, 실패는 500이 아닌 400)
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Invalid JSON body'}), 400
+
+        # 필수 필드 검증 - 다운스트림 서비스 호출 전에 즉시 실패
+        for field in _REQUIRED_GENERATE_FIELDS:
             if field not in data:
                 return jsonify({'error': f'필수 필드가 누락되었습니다: {field}'}), 400
-        
+
         provider = data['provider']
         model = data['model']
         prompt = data['prompt']
         parameters = data.get('parameters', {})
         commit_to_blockchain = data.get('commit_to_blockchain', True)
-        
-        # 1. Consensus 검증 실행
-        consensus_service = ConsensusService()
-        consensus_result = consensus_service.run_consensus_validation(prompt)
-        
-        # Consensus 검증 실패 시 결과만 반환 (에러가 아닌 정상 응답)
-        if not consensus_result['consensus_passed']:
-            return jsonify({
-                'success': True,
-                'consensus_only': True,
-                'consensus_result': consensus_result,
-                'message': consensus_result['consensus_message']
-            }), 200
-        
-        # 2. LLM 서비스 호출
-        llm_service = LLMService()
-        llm_response = llm_service.call_llm(provider, model, prompt, parameters)
-        
-        # 3. 해시 생성 (consensus 정보 포함)
-        hash_service = HashService()
-        timestamp = datetime.utcnow()  # timestamp 변수로 저장
-        hash_value = hash_service.generate_hash(
-            llm_provider=provider,
-            model_name=model,
-            prompt=prompt,
-            response=llm_response['content'],
-            parameters=parameters,
-            timestamp=timestamp,
-            consensus_votes=f"{consensus_result['safe_votes']}/{consensus_result['total_models']}"
-        )
-        
-        result = {
-            'request_id': llm_response['request_id'],
-            'content': llm_response['content'],
-            'hash_value': hash_value,
-            'response_time': llm_response['response_time'],
-            'model': model,
-            'provider': provider,
-            'consensus_result': consensus_result
-        }
-        
-        # 4. 블록체인에 커밋
-        if commit_to_blockchain and Config.CONTRACT_ADDRESS:
-            blockchain_service = BlockchainService(
-                Config.ETHEREUM_RPC_URL,
-                Config.PRIVATE_KEY,
-                Config.CONTRACT_ADDRESS
-            )
-            # 해시 생성 시 사용된 정확한 timestamp와 consensus_votes 전달
-            # timestamp를 그대로 전달 (마이크로초 포함)
-            consensus_votes_str = f"{consensus_result['safe_votes']}/{consensus_result['total_models']}"
-            
-            commit_result = blockchain_service.commit_hash(
-                hash_value, 
-                prompt, 
-                llm_response['content'], 
-                provider, 
-                model,
-                timestamp,  # datetime 객체 그대로 전달
-                parameters,  # 파라미터 전달
-                consensus_votes_str,
-                wait_for_confirmation=False  # TX submission만, confirmation은 대기하지 않음
-            )
-            result['blockchain_commit'] = commit_result
-            
-            # 성공적으로 커밋된 경우 (pending 포함), 로컬 해시 대신 트랜잭션 해시를 반환
-            if commit_result.get('status') in ['success', 'pending'] and commit_result.get('transaction_hash'):
-                result['hash_value'] = commit_result['transaction_hash']
-        
+
+        # 비동기 잡 모드 - 파이프라인을 큐에 넣고 바로 응답
+        if data.get('async'):
+            job_id = str(uuid.uuid4())
+            _store_capped(_jobs, job_id, {'status': 'queued'})
+            _job_executor.submit(
+                _run_generation_job, job_id,
+                provider, model, prompt, parameters, commit_to_blockchain)
+            return jsonify({'job_id': job_id, 'status': 'queued'}), 202, {
+                'Location': f'/api/llm/generate/{job_id}'
+            }
+
+        result = _generate_pipeline(provider, model, prompt, parameters, commit_to_blockchain)
         return jsonify(result), 200
-        
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+
+@llm_bp.route('/generate/<job_id>', methods=['GET'])
+def get_generation_job(job_id):
+    """
+    비동기 생성 잡 상태/결과 조회
+    """
+    job = _jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job id'}), 404
+
+    return jsonify(job), 200
+
+
+@llm_bp.route('/commit-status/<hash_value>', methods=['GET'])
+def get_commit_status(hash_value):
+    """
+    백그라운드 블록체인 커밋 결과 조회 (트랜잭션 해시 포함)
+    """
+    commit_result = _commit_results.get(hash_value)
+    if commit_result is None:
+        return jsonify({'status': 'queued', 'hash_value': hash_value}), 200
+
+    return jsonify({'hash_value': hash_value, 'blockchain_commit': commit_result}), 200
+
+
+# /models는 상수 응답 - import 시 한 번만 직렬화하고 ETag로 재전송까지 생략
+_MODELS_BODY = json.dumps({
+    'openai': ['gpt-5-mini'],
+    'grok': ['llama-3.3-70b-instruct:free'],
+    'claude': ['claude-3.7-sonnet'],
+    'gemini': ['gemini-2.5-flash-lite'],
+    'deepseek': ['deepseek-chat'],
+    'llama': ['llama-3.1-8b-instruct']
+}).encode('utf-8')
+_MODELS_ETAG = hashlib.blake2b(_MODELS_BODY, digest_size=8).hexdigest()
+
+
 @llm_bp.route('/models', methods=['GET'])
 def get_available_models():
     """
     사용 가능한 LLM 모델 목록 조회 (저가 모델만)
     """
-    models = {
-        'openai': ['gpt-5-mini'],
-        'grok': ['llama-3.3-70b-instruct:free'],
-        'claude': ['claude-3.7-sonnet'],
-        'gemini': ['gemini-2.5-flash-lite'],
-        'deepseek': ['deepseek-chat'],
-        'llama': ['llama-3.1-8b-instruct']
-    }
-    
-    return jsonify(models), 200
+    # 클라이언트가 같은 버전을 캐시하고 있으면 본문 없이 304만 반환
+    if request.headers.get('If-None-Match') == _MODELS_ETAG:
+        return '', 304
+
+    return Response(_MODELS_BODY, mimetype='application/json', headers={
+        'ETag': _MODELS_ETAG,
+        'Cache-Control': 'public, max-age=3600'
+    })
 
 
 
@@ -128,8 +253,9 @@ def test_openrouter_connection():
     try:
         from app.services.llm_service import LLMService
         
-        data = request.get_json() or {}
-        
+        # 본문이 없어도 되는 테스트 라우트 - 파싱 실패/빈 본문은 기본값 사용
+        data = request.get_json(silent=True) or {}
+
         # 사용자가 입력한 프롬프트 사용, 없으면 기본값
         test_prompt = data.get('prompt', "안녕하세요! 간단한 인사말을 해주세요.")
         provider = data.get('provider', 'openai')
@@ -161,14 +287,17 @@ def test_openrouter_connection():
             'error': str(e)
         }), 500
 
-@llm_bp.route('/health', methods=['GET'])
-def health_check():
-    """
-    LLM 서비스 상태 확인
-    """
+# /health 프로브 캐시 - 오케스트레이터가 수 초 간격으로 폴링해도
+# 실제 LLM 호출(토큰 비용 + 수백 ms)은 TTL당 1번만 발생
+_HEALTH_TTL = 30  # seconds
+_health = {'ts': 0.0, 'code': 200, 'payload': None}
+
+
+def _run_health_probe():
+    """실제 LLM 왕복으로 상태를 측정하고 캐시 갱신"""
     try:
         llm_service = LLMService()
-        
+
         # 간단한 테스트 요청
         test_response = llm_service.call_llm(
             provider='openai',
@@ -176,14 +305,40 @@ def health_check():
             prompt='Hello',
             parameters={}
         )
-        
-        return jsonify({
+
+        payload = {
             'status': 'healthy',
             'test_response': test_response['content'][:50] + '...' if len(test_response['content']) > 50 else test_response['content']
-        }), 200
-        
+        }
+        code = 200
+
     except Exception as e:
-        return jsonify({
+        payload = {
             'status': 'unhealthy',
             'error': str(e)
-        }), 500
+        }
+        code = 500
+
+    _health.update(ts=time.time(), code=code, payload=payload)
+    return payload, code
+
+
+@llm_bp.route('/health', methods=['GET'])
+def health_check():
+    """
+    LLM 서비스 상태 확인 (TTL 캐시 - 폴링마다 실제 호출하지 않음)
+    """
+    if _health['payload'] is not None and time.time() - _health['ts'] < _HEALTH_TTL:
+        return jsonify(_health['payload']), _health['code']
+
+    payload, code = _run_health_probe()
+    return jsonify(payload), code
+
+
+@llm_bp.route('/health/deep', methods=['GET'])
+def deep_health_check():
+    """
+    LLM 서비스 상태 확인 (캐시 무시, 항상 실제 LLM 왕복 수행)
+    """
+    payload, code = _run_health_probe()
+    return jsonify(payload), code
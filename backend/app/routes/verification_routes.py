@@ -1,35 +1,70 @@
 from flask import Blueprint, request, jsonify
-from app.services.blockchain_service import BlockchainService
-from app.services.hash_service import HashService
+from app.services.blockchain_service import get_blockchain_service
+from app.services.hash_service import HashService, _secret_key_bytes
 from config import Config
 import hashlib
 import hmac
 import json
+import logging
+import re
+import sys
+import threading
+import time
 import requests
 from web3 import Web3
 
 verification_bp = Blueprint('verification', __name__)
 
+logger = logging.getLogger(__name__)
+
+# 요청 검증 스키마 (요청마다 리스트를 새로 만들지 않도록 모듈 상수로 고정)
+_REQUIRED_INPUT_DATA_FIELDS = ('hash', 'prompt', 'response', 'llm_provider', 'model_name', 'timestamp')
+
+# RPC 제공자 권장 배치 상한
+_MAX_BATCH_HASHES = 50
+
+# 트랜잭션 해시 형식 (0x + 64 hex) - RPC 왕복 전에 형식 오류를 걸러냄
+_TXHASH_RE = re.compile(r'^0x[0-9a-fA-F]{64}$')
+
+# 우리 공식 제출 주소 (소문자 리터럴 + intern - 비교 시 동일 객체 빠른 경로)
+_OFFICIAL_ADDRESS_LC = sys.intern("0xace2981d41dce58e6e27a3a04621194eca44ea65")
+
+# 확정된 트랜잭션은 불변이므로 검증 결과를 해시 기준으로 캐시
+# (pending/실패/미존재는 상태가 바뀔 수 있어 캐시하지 않음)
+_VERIFY_CACHE_TTL = 3600  # seconds
+_VERIFY_CACHE_MAX = 10_000
+_verify_cache = {}
+_verify_cache_lock = threading.Lock()
+
 @verification_bp.route('/verify', methods=['POST'])
 def verify_hash():
     """
     트랜잭션 해시를 통한 LLM 출력 검증 (Web3 RPC 사용)
     """
     try:
-        data = request.get_json()
-        
+        # 본문은 여기서 한 번만 파싱 (orjson provider 사용, 실패는 500이 아닌 400)
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Invalid JSON body'}), 400
+
         if 'hash_value' not in data:
             return jsonify({'error': 'Hash value is required'}), 400
         
         hash_value = data['hash_value']
-        
-        # Etherscan API를 통한 트랜잭션 검증
-        blockchain_service = BlockchainService(
-            Config.ETHEREUM_RPC_URL,
-            Config.PRIVATE_KEY,
-            Config.CONTRACT_ADDRESS
-        )
-        
+
+        # 형식이 틀린 해시는 RPC를 거치지 않고 즉시 거절
+        if not isinstance(hash_value, str) or not _TXHASH_RE.match(hash_value):
+            return jsonify({'error': 'Invalid transaction hash format (0x + 64 hex expected)'}), 400
+
+        # 확정된 트랜잭션의 재검증은 RPC 왕복 없이 캐시에서 반환
+        with _verify_cache_lock:
+            cached = _verify_cache.get(hash_value)
+        if cached is not None and time.time() - cached[0] < _VERIFY_CACHE_TTL:
+            return jsonify(cached[1]), 200
+
+        # 캐시된 서비스 재사용 (RPC 연결/ABI 로드는 프로세스당 1회)
+        blockchain_service = get_blockchain_service()
+
         # 트랜잭션 해시 검증
         verification_result = blockchain_service.verify_transaction_hash(hash_value)
         
@@ -38,9 +73,7 @@ def verify_hash():
         
         # 출처 검증 (from 주소가 우리 공식 주소와 일치하는지 확인)
         from_address = verification_result.get('from_address', '')
-        our_official_address = "0xaCE2981d41Dce58E6e27a3A04621194Eca44ea65"
-        our_official_address_lower = our_official_address.lower()  # UI 표시용 소문자 주소
-        origin_verified = from_address.lower() == our_official_address_lower if from_address else False
+        origin_verified = bool(from_address) and from_address.lower() == _OFFICIAL_ADDRESS_LC
         
         # 해시 검증 결과
         hash_verification = verification_result.get('hash_verification', {})
@@ -61,22 +94,73 @@ def verify_hash():
         else:
             message = 'Verification failed'
         
-        return jsonify({
+        payload = {
             'verified': verified,
             'transaction_hash': hash_value,
             'blockchain_info': verification_result,
             'origin_verification': {
                 'from_address': from_address,
-                'our_official_address': our_official_address_lower,  # UI에 소문자로 표시
+                'our_official_address': _OFFICIAL_ADDRESS_LC,  # UI에 소문자로 표시
                 'origin_verified': origin_verified
             },
             'hash_verification': hash_verification,
             'input_data': verification_result.get('input_data'),
             'message': message
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        }
+
+        # 체인에 확정된(success) 트랜잭션만 캐시 - 결과가 더 이상 변하지 않음
+        if verification_result.get('status') == 'success':
+            with _verify_cache_lock:
+                if len(_verify_cache) >= _VERIFY_CACHE_MAX:
+                    _verify_cache.pop(next(iter(_verify_cache)))
+                _verify_cache[hash_value] = (time.time(), payload)
+
+        return jsonify(payload), 200
+
+    except (KeyError, ValueError) as e:
+        # 잘못된 요청 데이터는 클라이언트 오류 - 재시도해도 같은 결과
+        return jsonify({'error': str(e)}), 400
+    except requests.Timeout:
+        # RPC 응답 지연은 게이트웨이 타임아웃으로 구분 (클라이언트가 재시도 판단 가능)
+        return jsonify({'error': 'rpc timeout'}), 504
+    except Exception:
+        # 예기치 못한 오류 - 내부 정보는 로그에만 남기고 응답에는 노출하지 않음
+        logger.exception("verify_hash failed")
+        return jsonify({'error': 'internal'}), 500
+
+
+@verification_bp.route('/verify/batch', methods=['POST'])
+def verify_hashes_batch():
+    """
+    여러 트랜잭션 해시를 한 번의 JSON-RPC 배치 요청으로 검증
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Invalid JSON body'}), 400
+
+        hashes = data.get('hashes')
+        if not hashes or not isinstance(hashes, list):
+            return jsonify({'error': 'hashes list is required'}), 400
+        if len(hashes) > _MAX_BATCH_HASHES:
+            return jsonify({'error': f'Too many hashes (max {_MAX_BATCH_HASHES})'}), 400
+
+        for h in hashes:
+            if not isinstance(h, str) or not _TXHASH_RE.match(h):
+                return jsonify({'error': f'Invalid transaction hash format: {h}'}), 400
+
+        blockchain_service = get_blockchain_service()
+        results = blockchain_service.verify_transaction_hashes(hashes)
+
+        return jsonify({'results': results}), 200
+
+    except (KeyError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    except requests.Timeout:
+        return jsonify({'error': 'rpc timeout'}), 504
+    except Exception:
+        logger.exception("verify_hashes_batch failed")
+        return jsonify({'error': 'internal'}), 500
 
 
 @verification_bp.route('/verify-input-data', methods=['POST'])
@@ -106,28 +190,33 @@ def verify_from_input_data():
     }
     """
     try:
-        data = request.get_json()
-        
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Invalid JSON body'}), 400
+
         # 두 가지 입력 형식 지원
         if 'input_data' in data:
-            # UTF-8 문자열로 받은 경우 파싱
-            lines = data['input_data'].strip().split('\n')
+            # UTF-8 문자열로 받은 경우 파싱 (splitlines는 \r\n까지 처리)
+            # 바깥 strip은 유지 - 붙여넣은 블록의 선행 빈 줄이
+            # 필드 정렬을 한 줄씩 밀어버리는 것을 방지
+            lines = data['input_data'].strip().splitlines()
             if len(lines) < 7:
                 return jsonify({'error': 'Invalid input data format (minimum 7 fields required)'}), 400
-            
+
+            # 짧은 필드만 strip - prompt/response의 앞뒤 공백은
+            # 생성 시 해시에 그대로 포함된 데이터이므로 건드리면 검증이 깨짐
             extracted_data = {
                 'hash': lines[0].strip(),
-                'prompt': lines[1].strip(),
-                'response': lines[2].strip(),
+                'prompt': lines[1],
+                'response': lines[2],
                 'llm_provider': lines[3].strip(),
                 'model_name': lines[4].strip(),
                 'timestamp': lines[5].strip(),
-                'consensus_votes': lines[6].strip() if len(lines) > 6 else ''
+                'consensus_votes': lines[6].strip()
             }
         else:
             # JSON 객체로 받은 경우
-            required_fields = ['hash', 'prompt', 'response', 'llm_provider', 'model_name', 'timestamp']
-            for field in required_fields:
+            for field in _REQUIRED_INPUT_DATA_FIELDS:
                 if field not in data:
                     return jsonify({'error': f'Required field is missing: {field}'}), 400
             
@@ -158,34 +247,36 @@ def verify_from_input_data():
         
         # JSON 문자열로 변환 (HashService와 동일한 방식)
         json_string = json.dumps(hash_data, sort_keys=True, ensure_ascii=False)
-        
-        # HMAC secret key 가져오기
-        secret_key = Config.HMAC_SECRET_KEY
-        if not secret_key:
-            return jsonify({'error': 'HMAC_SECRET_KEY가 설정되지 않았습니다. 환경변수를 확인해주세요.'}), 500
-        
+
         # 🔐 HMAC-SHA256 해시 계산 (보안 강화)
         # secret_key를 모르면 올바른 해시를 생성할 수 없음
-        calculated_hash = hmac.new(
-            key=secret_key.encode('utf-8'),
+        # (key는 HashService와 공유하는 프로세스 캐시에서 가져옴)
+        try:
+            key_bytes = _secret_key_bytes()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 500
+
+        calculated_digest = hmac.new(
+            key=key_bytes,
             msg=json_string.encode('utf-8'),
             digestmod=hashlib.sha256
-        ).hexdigest()
-        
-        # 원본 해시와 비교
+        ).digest()
+        calculated_hash = calculated_digest.hex()  # 응답 표시용 hex
+
+        # 원본 해시와 비교 (고정 시간 비교 - 타이밍 부채널 방지)
         original_hash = extracted_data['hash']
-        hash_matches = calculated_hash == original_hash
-        
-        # 로그 출력
-        print("=" * 80)
-        print("🔍 HMAC HASH VERIFICATION FROM INPUT DATA")
-        print("=" * 80)
-        print(f"원본 HMAC 해시:   {original_hash}")
-        print(f"계산된 HMAC 해시: {calculated_hash}")
-        print(f"일치 여부:        {'✅ 일치' if hash_matches else '❌ 불일치'}")
-        print(f"🔑 보안:          Secret key로 검증됨 (네트워크 중간 공격 방지)")
-        print("=" * 80)
+        try:
+            original_digest = bytes.fromhex(original_hash)
+        except ValueError:
+            return jsonify({'error': 'Invalid hash format (hex expected)'}), 400
+
+        hash_matches = hmac.compare_digest(calculated_digest, original_digest)
         
+        # 핫패스의 동기 stdout 출력 대신 DEBUG 로그 (비활성 시 포맷 비용도 없음)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("HMAC verify (input data): orig=%s calc=%s match=%s",
+                         original_hash, calculated_hash, hash_matches)
+
         return jsonify({
             'verified': hash_matches,
             'original_hash': original_hash,
@@ -206,9 +297,12 @@ def verify_from_input_data():
             },
             'message': 'HMAC 해시가 일치합니다. 데이터 무결성과 인증이 확인되었습니다.' if hash_matches else 'HMAC 해시가 일치하지 않습니다. 데이터가 변조되었거나 인증되지 않은 출처입니다.'
         }), 200
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+
+    except (KeyError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception:
+        logger.exception("verify_from_input_data failed")
+        return jsonify({'error': 'internal'}), 500
 
 
 #not used for now network check
@@ -224,18 +318,17 @@ def get_blockchain_status():
                 'message': 'Blockchain configuration is not complete'
             }), 200
         
-        blockchain_service = BlockchainService(
-            Config.ETHEREUM_RPC_URL,
-            Config.PRIVATE_KEY,
-            Config.CONTRACT_ADDRESS
-        )
-        
+        blockchain_service = get_blockchain_service()
+
         network_info = blockchain_service.get_network_info()
         return jsonify(network_info), 200
-        
-    except Exception as e:
+
+    except requests.Timeout:
+        return jsonify({'status': 'error', 'error_message': 'rpc timeout'}), 504
+    except Exception:
+        logger.exception("get_blockchain_status failed")
         return jsonify({
             'status': 'error',
-            'error_message': str(e)
+            'error_message': 'internal'
         }), 500
 
@@ -1,5 +1,8 @@
 from web3 import Web3
+import functools
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import os
 from typing import Dict, Any, Optional
@@ -9,8 +12,16 @@ class BlockchainService:
     """블록체인 연동 서비스"""
 #region 생성자
     def __init__(self, rpc_url: str, private_key: str, contract_address: str):
+        # keep-alive 커넥션 풀 공유 세션 - RPC 호출마다 TCP/TLS 핸드셰이크를 다시 하지 않음
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=3, backoff_factor=0.1)
+        ))
+        self.rpc_url = rpc_url
         # 우리가 Web3 HTTP 사용해서 rpc_url: sepolia testnet 에 연결해서 반환하는 w3 객체 생성
-        self.w3 = Web3(Web3.HTTPProvider(rpc_url))
+        self.w3 = Web3(Web3.HTTPProvider(rpc_url, session=self.session))
         # 개인키 정리 (0x 접두사 제거 후 다시 추가) 자꾸 해시 포멧 안맞는다해서 넣음
         if private_key.startswith('0x'):
             private_key = private_key[2:]
@@ -480,29 +491,30 @@ class BlockchainService:
         total_verification_start = time.time()
         
         try:
-            # Web3를 사용하여 트랜잭션 정보 조회
+            # 트랜잭션과 영수증을 JSON-RPC 배치 하나로 동시 조회
+            # (직렬 2회 왕복 → 1회 왕복, TLS 왕복이 지연의 대부분이므로 절반 절감)
             rpc_call_start = time.time()
-            tx = self.w3.eth.get_transaction(transaction_hash)
-            rpc_call_time_tx = time.time() - rpc_call_start
-            
+            payload = [
+                {'jsonrpc': '2.0', 'id': 0, 'method': 'eth_getTransactionByHash', 'params': [transaction_hash]},
+                {'jsonrpc': '2.0', 'id': 1, 'method': 'eth_getTransactionReceipt', 'params': [transaction_hash]},
+            ]
+            rpc_response = self.session.post(self.rpc_url, json=payload, timeout=30)
+            rpc_response.raise_for_status()
+            by_id = {item.get('id'): item.get('result') for item in rpc_response.json()}
+            tx = by_id.get(0)
+            receipt = by_id.get(1)
+            rpc_call_time_batch = time.time() - rpc_call_start
+
             # 디버깅을 위한 로그
-            print(f"Web3 트랜잭션 조회 성공: {transaction_hash}")
-            
+            print(f"트랜잭션/영수증 배치 조회 완료: {transaction_hash}")
+
             if tx is None:
                 return {
                     'exists': False,
                     'status': 'error',
                     'error_message': '트랜잭션을 찾을 수 없습니다'
                 }
-            
-            # 트랜잭션 영수증 조회
-            rpc_call_receipt_start = time.time()
-            receipt = self.w3.eth.get_transaction_receipt(transaction_hash)
-            rpc_call_time_receipt = time.time() - rpc_call_receipt_start
-            
-            # 디버깅을 위한 로그
-            print(f"Web3 영수증 조회 성공")
-            
+
             # 트랜잭션 영수증이 없는 경우 (pending 상태)
             if receipt is None:
                 return {
@@ -512,12 +524,12 @@ class BlockchainService:
                     'transaction_hash': transaction_hash,
                     'from_address': tx.get('from'),
                     'to_address': tx.get('to'),
-                    'value': tx.get('value'),
+                    'value': int(tx.get('value', '0x0'), 16),
                     'etherscan_url': f"https://sepolia.etherscan.io/tx/{transaction_hash}"
                 }
-            
-            # 트랜잭션 성공 여부 확인
-            is_success = receipt.status == 1
+
+            # 트랜잭션 성공 여부 확인 (raw JSON-RPC 영수증은 hex 문자열)
+            is_success = receipt.get('status') == '0x1'
             
             # Input Data 추출 및 디코딩
             input_data_hex = tx.get('input', '0x')
@@ -544,19 +556,18 @@ class BlockchainService:
             return {
                 'exists': True,
                 'transaction_hash': transaction_hash,
-                'block_number': receipt.blockNumber,
-                'gas_used': receipt.gasUsed,
+                'block_number': int(receipt['blockNumber'], 16) if receipt.get('blockNumber') else None,
+                'gas_used': int(receipt['gasUsed'], 16) if receipt.get('gasUsed') else None,
                 'status': 'success' if is_success else 'failed',
                 'is_success': is_success,
                 'from_address': tx.get('from'),
                 'to_address': tx.get('to'),
-                'value': tx.get('value'),
+                'value': int(tx.get('value', '0x0'), 16),
                 'etherscan_url': f"https://sepolia.etherscan.io/tx/{transaction_hash}",
                 'input_data': decoded_input_data,
                 'hash_verification': hash_verification,
                 'timing': {
-                    'rpc_call_time_tx': rpc_call_time_tx,
-                    'rpc_call_time_receipt': rpc_call_time_receipt,
+                    'rpc_call_time_batch': rpc_call_time_batch,
                     'hash_verification_time': hash_verification_time,
                     'total_verification_time': total_verification_time
                 }
@@ -577,6 +588,46 @@ class BlockchainService:
                 'error_message': f'트랜잭션 조회 실패: {error_msg}'
             }
     
+    def verify_transaction_hashes(self, transaction_hashes: list) -> list:
+        """
+        여러 트랜잭션 해시를 JSON-RPC 배치 한 번으로 조회
+
+        eth_getTransactionReceipt 요청들을 하나의 HTTP POST로 묶어
+        해시 N개당 N번의 왕복을 1번으로 줄임 (상한은 라우트에서 관리).
+
+        Args:
+            transaction_hashes: 검증할 트랜잭션 해시 목록
+
+        Returns:
+            list: 해시별 {transaction_hash, exists, is_success} 목록
+        """
+        payload = [
+            {'jsonrpc': '2.0', 'id': i, 'method': 'eth_getTransactionReceipt', 'params': [tx_hash]}
+            for i, tx_hash in enumerate(transaction_hashes)
+        ]
+        response = self.session.post(self.rpc_url, json=payload, timeout=30)
+        response.raise_for_status()
+        # 배치 응답 순서는 보장되지 않으므로 id 기준으로 매핑
+        by_id = {item.get('id'): item for item in response.json()}
+
+        results = []
+        for i, tx_hash in enumerate(transaction_hashes):
+            receipt = (by_id.get(i) or {}).get('result')
+            if receipt is None:
+                results.append({
+                    'transaction_hash': tx_hash,
+                    'exists': False,
+                    'is_success': False
+                })
+            else:
+                results.append({
+                    'transaction_hash': tx_hash,
+                    'exists': True,
+                    'is_success': receipt.get('status') == '0x1',
+                    'block_number': int(receipt['blockNumber'], 16) if receipt.get('blockNumber') else None
+                })
+        return results
+
     def _decode_input_data(self, input_data_hex: str) -> Dict[str, Any]:
         """
         트랜잭션 Input Data 디코딩
@@ -654,22 +705,20 @@ class BlockchainService:
             
             # JSON 문자열로 변환 (HashService와 동일한 방식)
             json_string = json.dumps(hash_data, sort_keys=True, ensure_ascii=False)
-            
-            # HMAC secret key 가져오기
-            secret_key = Config.HMAC_SECRET_KEY
-            if not secret_key:
-                raise ValueError("HMAC_SECRET_KEY가 설정되지 않았습니다. 환경변수를 확인해주세요.")
-            
+
             # 🔐 HMAC-SHA256 해시 계산 (보안 강화)
+            # key는 HashService와 공유하는 프로세스 캐시에서 가져옴
+            from app.services.hash_service import _secret_key_bytes
+
             calculated_hash = hmac.new(
-                key=secret_key.encode('utf-8'),
+                key=_secret_key_bytes(),
                 msg=json_string.encode('utf-8'),
                 digestmod=hashlib.sha256
             ).hexdigest()
             
-            # 원본 해시와 비교
+            # 원본 해시와 비교 (고정 시간 비교 - 타이밍 부채널 방지)
             original_hash = input_data['hash']
-            hash_matches = calculated_hash == original_hash
+            hash_matches = hmac.compare_digest(calculated_hash, original_hash)
             
             # 로그 출력
             print("=" * 80)
@@ -710,3 +759,18 @@ class BlockchainService:
                 'status': 'error',
                 'error_message': str(e)
             }
+
+
+@functools.lru_cache(maxsize=1)
+def get_blockchain_service() -> BlockchainService:
+    """
+    프로세스당 하나의 BlockchainService 인스턴스 반환
+
+    생성자가 HTTP provider 연결 + 계정 생성 + ABI 파일 로드를 수행하므로
+    요청마다 새로 만들지 않고 캐시해서 재사용
+    """
+    return BlockchainService(
+        Config.ETHEREUM_RPC_URL,
+        Config.PRIVATE_KEY,
+        Config.CONTRACT_ADDRESS
+    )
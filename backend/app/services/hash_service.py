@@ -1,3 +1,4 @@
+import functools
 import hashlib
 import hmac
 import json
@@ -5,6 +6,16 @@ from datetime import datetime
 from typing import Dict, Any
 from config import Config
 
+
+@functools.lru_cache(maxsize=1)
+def _secret_key_bytes() -> bytes:
+    """HMAC secret key는 프로세스 수명 동안 불변 - 호출마다 조회/encode하지 않음"""
+    secret_key = Config.HMAC_SECRET_KEY
+    if not secret_key:
+        raise ValueError("HMAC_SECRET_KEY가 설정되지 않았습니다. 환경변수를 확인해주세요.")
+    return secret_key.encode('utf-8')
+
+
 class HashService:
     """
     HMAC 기반 보안 해시 생성 및 검증 서비스
@@ -84,15 +95,10 @@ class HashService:
         print(f"📏 JSON 길이: {len(json_string)} bytes")
         print()
         
-        # HMAC secret key 가져오기
-        secret_key = Config.HMAC_SECRET_KEY
-        if not secret_key:
-            raise ValueError("HMAC_SECRET_KEY가 설정되지 않았습니다. 환경변수를 확인해주세요.")
-        
         # 🔐 HMAC-SHA256 해시 생성 (보안 강화)
         # secret_key를 모르면 올바른 해시를 생성할 수 없음
         calculated_hash = hmac.new(
-            key=secret_key.encode('utf-8'),
+            key=_secret_key_bytes(),
             msg=json_string.encode('utf-8'),
             digestmod=hashlib.sha256
         ).hexdigest()
@@ -140,4 +146,5 @@ class HashService:
         expected_hash = HashService.generate_hash(
             llm_provider, model_name, prompt, response, parameters, timestamp, consensus_votes
         )
-        return hash_value == expected_hash
+        # 고정 시간 비교 - 타이밍 부채널 방지
+        return hmac.compare_digest(hash_value, expected_hash)
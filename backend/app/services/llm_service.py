@@ -1,9 +1,38 @@
-import requests
+import functools
+import json
+import httpx
 import time
 import uuid
 import os
 from typing import Dict, Any, Optional
 
+# 모든 OpenRouter 호출이 공유하는 HTTP/2 클라이언트 (스레드 안전)
+# keep-alive + 스트림 멀티플렉싱으로 호출마다 TLS 핸드셰이크를 반복하지 않고,
+# consensus의 동시 5개 호출도 같은 커넥션 위에서 다중화됨
+_http = httpx.Client(
+    http2=True,
+    timeout=120.0,  # 60초 → 120초 (200% 증가)
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_llm_service() -> "LLMService":
+    """프로세스당 하나의 LLMService 인스턴스 (환경변수/모델 매핑은 불변)"""
+    return LLMService()
+
+
+@functools.lru_cache(maxsize=2048)
+def _cached_openrouter_call(provider: str, prompt: str, params_key: str) -> Dict[str, Any]:
+    """
+    결정적(temperature=0) 호출의 정확-일치 캐시
+
+    동일한 (provider, prompt, parameters) 재호출 시 실제 API 비용과
+    수백 ms의 지연을 모두 제거함. 비결정적 호출은 call_llm에서 걸러짐.
+    """
+    return _get_llm_service()._call_openrouter(provider, prompt, json.loads(params_key))
+
+
 class LLMService:
     """LLM API 호출 서비스 - OpenRouter 통합"""
     
@@ -52,9 +81,14 @@ class LLMService:
         start_time = time.time()
         
         try:
-            # OpenRouter를 통한 API 호출
-            response = self._call_openrouter(provider, prompt, parameters)
-            
+            # temperature > 0 응답은 비결정적이므로 캐시하지 않음 (기본값 포함)
+            if parameters.get('temperature', 1) == 0:
+                params_key = json.dumps(parameters, sort_keys=True)
+                response = _cached_openrouter_call(provider, prompt, params_key)
+            else:
+                # OpenRouter를 통한 API 호출
+                response = self._call_openrouter(provider, prompt, parameters)
+
             response_time = time.time() - start_time
             
             return {
@@ -86,23 +120,24 @@ class LLMService:
             "X-Title": "LLM Verification System"
         }
         
+        # 호출자 파라미터를 실제 요청에 반영 (기존 하드코딩 값은 기본값으로 유지)
+        # call_llm의 temperature=0 캐시 게이트는 전송되는 요청과 일치해야 함
         payload = {
             "model": model,
             "messages": [
                 {"role": "user", "content": prompt}
             ],
-            "temperature": 0.2,
-            "max_tokens": 200
+            "temperature": parameters.get('temperature', 0.2),
+            "max_tokens": parameters.get('max_tokens', 200)
         }
         
         try:
-            response = requests.post(
+            response = _http.post(
                 f"{self.base_url}/chat/completions",
                 headers=headers,
-                json=payload,
-                timeout=120  # 60초 → 120초 (200% 증가)
+                json=payload
             )
-            
+
             if response.status_code != 200:
                 error_msg = f"OpenRouter API 오류: {response.status_code}"
                 if response.text:
@@ -130,7 +165,7 @@ class LLMService:
                 'usage': data.get('usage', {})
             }
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise Exception(f"OpenRouter API 요청 실패: {str(e)}")
         except Exception as e:
             raise Exception(f"OpenRouter API 호출 중 오류: {str(e)}")
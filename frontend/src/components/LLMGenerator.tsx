@@ -39,6 +39,32 @@ export default function LLMGenerator({ models }: LLMGeneratorProps) {
 
   const selectedProvider = watch('provider');
 
+  // Poll the background commit until the transaction hash is available,
+  // then swap it in for the local HMAC hash (same as the old sync response)
+  const pollCommitStatus = async (hashValue: string) => {
+    for (let attempt = 0; attempt < 30; attempt++) {
+      await new Promise(resolve => setTimeout(resolve, 2000));
+      try {
+        const status = await llmApi.getCommitStatus(hashValue);
+        const commit = status.blockchain_commit;
+        if (commit) {
+          setResult(prev => {
+            // Ignore stale polls if a new generation replaced the result
+            if (!prev || prev.hash_value !== hashValue) return prev;
+            const next = { ...prev, blockchain_commit: commit };
+            if ((commit.status === 'success' || commit.status === 'pending') && commit.transaction_hash) {
+              next.hash_value = commit.transaction_hash;
+            }
+            return next;
+          });
+          return;
+        }
+      } catch {
+        // Transient errors: retry on the next poll
+      }
+    }
+  };
+
   // LLM generation mutation (with Consensus stage)
   const generateMutation = useMutation(llmApi.generate, {
     onMutate: () => {
@@ -62,6 +88,11 @@ export default function LLMGenerator({ models }: LLMGeneratorProps) {
       setConsensusResult(data.consensus_result || null);
       setCurrentStep('completed');
       toast.success('LLM response has been generated with consensus validation!');
+
+      // The commit now runs in the background; poll until the tx hash arrives
+      if (data.blockchain_commit?.status === 'queued' && data.hash_value) {
+        pollCommitStatus(data.hash_value);
+      }
     },
     onError: (error: any) => {
       setCurrentStep('error');
@@ -379,7 +410,7 @@ export default function LLMGenerator({ models }: LLMGeneratorProps) {
             {result.blockchain_commit && (
               <div className="card bg-gradient-to-br from-blue-50 to-indigo-50 border-blue-200">
                 <h4 className="text-lg font-bold text-gray-900 mb-6">Blockchain Commit Result</h4>
-                {result.blockchain_commit.status === 'success' || result.blockchain_commit.status === 'pending' ? (
+                {result.blockchain_commit.status === 'success' || result.blockchain_commit.status === 'pending' || result.blockchain_commit.status === 'queued' ? (
                   <div className="space-y-5">
                     <div className="flex items-center space-x-4">
                       <div className="flex-shrink-0">
@@ -390,9 +421,13 @@ export default function LLMGenerator({ models }: LLMGeneratorProps) {
                         </div>
                       </div>
                       <div>
-                        <div className="text-xl font-bold text-emerald-900">Success</div>
+                        <div className="text-xl font-bold text-emerald-900">
+                          {result.blockchain_commit.status === 'queued' ? 'Submitting' : 'Success'}
+                        </div>
                         <div className="text-sm text-gray-600">
-                          Transaction has been submitted to the blockchain
+                          {result.blockchain_commit.status === 'queued'
+                            ? 'Transaction is being submitted to the blockchain'
+                            : 'Transaction has been submitted to the blockchain'}
                         </div>
                       </div>
                     </div>
@@ -50,6 +50,14 @@ export const llmApi = {
     return response.data;
   },
 
+  // 백그라운드 블록체인 커밋 결과 조회 (큐에 있는 동안은 blockchain_commit 없이 응답)
+  getCommitStatus: async (
+    hashValue: string
+  ): Promise<{ hash_value: string; status?: string; blockchain_commit?: LLMResponse['blockchain_commit'] }> => {
+    const response = await api.get(`/llm/commit-status/${hashValue}`);
+    return response.data;
+  },
+
   // 사용 가능한 모델 목록 조회
   getModels: async (): Promise<Record<string, string[]>> => {
     const response: AxiosResponse<Record<string, string[]>> = await api.get('/llm/models');